@@ -0,0 +1,250 @@
+# scripts/benchmark.py
+# Benchmark suite for the model pipeline, with JSON baselines and regression thresholds
+# - Golden check first: the monthly model and both annual P&Ls, built the way the CLIs build them,
+#   must reproduce data/*.csv byte for byte (a faster engine that changes a cent fails here)
+# - Synthetic workloads:
+#     horizon    5 / 30 / 100-year horizons           -> monthly, accrual, cash
+#     catalog    10 .. 10k-row miner sheets            -> catalog parse, compare_hash.py, monthly
+#     scenarios  1 .. 100k sweep scenarios (5 years)  -> sweep
+# - Each case: wall time over --repeat runs (min + median), then one extra run under tracemalloc
+#   for peak Python/NumPy memory
+# - --save-baseline writes the results as the baseline; otherwise they are compared to it and any
+#   case slower (or larger) than baseline * (1 + threshold) is flagged, exit code 1
+# - Baselines are machine-specific: save one per machine before comparing engines
+
+import argparse
+import json
+import platform
+import runpy
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+import miner_catalog
+from build_annual_pnl_accrual import build_accrual
+from build_annual_pnl_cash import build_cash
+from build_monthly_model import build_monthly_model
+from miner_catalog import MinerCatalog
+from sweep_assumptions import run_sweep
+
+ROOT = Path(__file__).resolve().parents[1]
+SUITES = {
+    "horizon": (5, 30, 100),
+    "catalog": (10, 100, 1000, 10000),
+    "scenarios": (1, 100, 10000, 100000),
+}
+GOLDEN = ("monthly_model_2025_2030.csv", "annual_pnl_accrual.csv", "annual_pnl_cash.csv")
+
+# ---------- Golden outputs
+
+def golden_outputs(assumptions: dict, repo_root: Path) -> dict:
+    """CSV text of each golden file, built like the CLIs: rounded monthly CSV -> annual P&Ls."""
+    monthly_csv = build_monthly_model(assumptions, repo_root).to_csv(index=False)
+    monthly = pd.read_csv(StringIO(monthly_csv))
+    return {
+        GOLDEN[0]: monthly_csv,
+        GOLDEN[1]: build_accrual(assumptions, repo_root, monthly=monthly.copy()).to_csv(index=False),
+        GOLDEN[2]: build_cash(assumptions, repo_root, monthly=monthly.copy()).to_csv(index=False),
+    }
+
+def check_golden(assumptions: dict, repo_root: Path) -> list:
+    """Names of golden files whose bytes differ from a fresh build (empty list when all match)."""
+    built = golden_outputs(assumptions, repo_root)
+    return [name for name, text in built.items()
+            if (repo_root / "data" / name).read_bytes() != text.encode()]
+
+# ---------- Synthetic workloads
+
+def _horizon(assumptions: dict, years: int) -> dict:
+    start = np.datetime64(assumptions["start_month"], "M")
+    return dict(assumptions, end_month=str(start + years * 12 - 1))
+
+def _write_sheet(path: Path, rows: int, unit: str, scale: float, seed: int):
+    """Miner sheet with `rows` SKUs in the repo's header layout; last row is "bench-model"."""
+    rng = np.random.default_rng(seed)
+    hashrate = np.round(rng.uniform(0.5, 2.0, rows) * scale, 1)
+    power = np.round(rng.uniform(1500, 4000, rows), 0)
+    price = np.round(rng.uniform(500, 6000, rows), 0)
+    models = [f"synth-{i}" for i in range(rows - 1)] + ["bench-model"]
+    pd.DataFrame({
+        "model": models,
+        f"hashrate({unit})": hashrate,
+        "power(W)": power,
+        "price": price,
+    }).to_csv(path, index=False)
+
+def _catalog_tree(tmp: Path, assumptions: dict, rows: int) -> dict:
+    """Temp repo (data/ + config/ + scripts/compare_hash.py) with synthetic sheets; assumptions pointing at them."""
+    for d in ("data", "config", "scripts"):
+        (tmp / d).mkdir(parents=True, exist_ok=True)
+    shutil.copy(ROOT / "scripts" / "compare_hash.py", tmp / "scripts" / "compare_hash.py")
+    _write_sheet(tmp / "data" / "btc_miner_sheet.csv", rows, "TH/s", 200.0, seed=rows)
+    _write_sheet(tmp / "data" / "etc_miner_sheet.csv", rows, "GH/s", 1.0, seed=rows + 1)
+    conf = json.loads(json.dumps(assumptions))
+    for chain in ("btc", "etc"):
+        conf[chain]["source_csv"] = str(tmp / "data" / f"{chain}_miner_sheet.csv")
+        conf[chain]["model_name"] = "bench-model"
+    (tmp / "config" / "assumptions.json").write_text(json.dumps(conf, indent=2))
+    return conf
+
+def _sweep_spec(n: int) -> dict:
+    return {"elec_rate_usd_per_kwh": {"start": 0.04, "stop": 0.16, "num": n}}
+
+def _run_script(script: Path) -> dict:
+    argv = sys.argv
+    sys.argv = [str(script)]  # the script's own defaults, not benchmark.py's flags
+    try:
+        with redirect_stdout(StringIO()):
+            return runpy.run_path(str(script), run_name="__main__")
+    finally:
+        sys.argv = argv
+
+def _cases(suite: str, size: int, assumptions: dict, repo_root: Path, tmp: Path) -> dict:
+    """{stage: zero-arg callable} for one workload size."""
+    if suite == "horizon":
+        conf = _horizon(assumptions, size)
+        monthly = pd.read_csv(StringIO(build_monthly_model(conf, repo_root).to_csv(index=False)))
+        return {
+            "monthly": lambda: build_monthly_model(conf, repo_root),
+            "accrual": lambda: build_accrual(conf, repo_root, monthly=monthly.copy()),
+            "cash": lambda: build_cash(conf, repo_root, monthly=monthly.copy()),
+        }
+    if suite == "catalog":
+        conf = _catalog_tree(tmp / f"catalog_{size}", assumptions, size)
+        sheets = {c: Path(conf[c]["source_csv"]) for c in ("btc", "etc")}
+        script = tmp / f"catalog_{size}" / "scripts" / "compare_hash.py"
+
+        def fresh(fn):
+            # Drop the in-process memo so every run parses (or loads) the sheets again
+            def run():
+                miner_catalog._SHEET_MEMO.clear()
+                return fn()
+            return run
+        return {
+            "catalog_parse": fresh(lambda: MinerCatalog.from_sheets(sheets, cache_dir=None)),
+            "compare_hash": fresh(lambda: _run_script(script)),
+            "monthly": fresh(lambda: build_monthly_model(conf, repo_root)),
+        }
+    spec = _sweep_spec(size)
+    return {"sweep": lambda: run_sweep(assumptions, spec, repo_root)}
+
+# ---------- Measurement
+
+def measure(fn, repeat: int) -> dict:
+    """Wall time over `repeat` runs, then peak traced memory of one more run."""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    rows = len(out) if hasattr(out, "__len__") and not isinstance(out, dict) else None
+    return {
+        "seconds": round(min(times), 6),
+        "median_seconds": round(statistics.median(times), 6),
+        "peak_mb": round(peak / 2**20, 3),
+        "rows": rows,
+    }
+
+def run_benchmarks(assumptions: dict, repo_root: Path, suites=tuple(SUITES), repeat: int = 3,
+                   max_size: int = None, log=print) -> dict:
+    """{"<suite>/<size>/<stage>": measurement} for every selected workload."""
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="bench-") as tmp:
+        for suite in suites:
+            for size in SUITES[suite]:
+                if max_size is not None and size > max_size:
+                    continue
+                for stage, fn in _cases(suite, size, assumptions, repo_root, Path(tmp)).items():
+                    key = f"{suite}/{size}/{stage}"
+                    results[key] = measure(fn, repeat)
+                    log(f"{key:<32} {results[key]['seconds']:>10.4f}s {results[key]['peak_mb']:>10.1f} MB")
+    return results
+
+def compare(results: dict, baseline: dict, threshold: float, mem_threshold: float,
+            min_seconds: float = 0.005) -> list:
+    """(case, metric, baseline, current, ratio) for every case beyond its threshold."""
+    flagged = []
+    for key, cur in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if cur["seconds"] > base["seconds"] * (1 + threshold) and cur["seconds"] - base["seconds"] > min_seconds:
+            flagged.append((key, "seconds", base["seconds"], cur["seconds"], cur["seconds"] / base["seconds"]))
+        if base["peak_mb"] > 0 and cur["peak_mb"] > base["peak_mb"] * (1 + mem_threshold):
+            flagged.append((key, "peak_mb", base["peak_mb"], cur["peak_mb"], cur["peak_mb"] / base["peak_mb"]))
+    return flagged
+
+def _meta() -> dict:
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+    }
+
+# ---------- CLI
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Time and memory benchmarks for the model pipeline")
+    ap.add_argument("--suite", choices=list(SUITES) + ["all"], default="all")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--max-size", type=int, default=None, help="skip workloads larger than this")
+    ap.add_argument("--baseline", default="reports/bench_baseline.json")
+    ap.add_argument("--out", default="reports/bench_latest.json")
+    ap.add_argument("--save-baseline", action="store_true", help="write results to --baseline")
+    ap.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown, fraction")
+    ap.add_argument("--mem-threshold", type=float, default=0.25, help="allowed peak memory growth, fraction")
+    ap.add_argument("--skip-golden", action="store_true")
+    args = ap.parse_args()
+
+    repo_root = Path(".")
+    conf_path = repo_root / "config" / "assumptions.json"
+    if not conf_path.exists():
+        raise SystemExit(f"Missing assumptions file: {conf_path}")
+    assumptions = json.loads(conf_path.read_text())
+
+    if not args.skip_golden:
+        mismatched = check_golden(assumptions, repo_root)
+        if mismatched:
+            raise SystemExit(f"Golden outputs differ from a fresh build: {mismatched}")
+        print(f"Golden outputs match: {', '.join(GOLDEN)}")
+
+    suites = tuple(SUITES) if args.suite == "all" else (args.suite,)
+    results = run_benchmarks(assumptions, repo_root, suites, args.repeat, args.max_size)
+    report = {"meta": _meta(), "results": results}
+
+    out = repo_root / args.out
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"Wrote {out}")
+
+    baseline_path = repo_root / args.baseline
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(report, indent=2))
+        print(f"Saved baseline {baseline_path}")
+    elif baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text())["results"]
+        flagged = compare(results, baseline, args.threshold, args.mem_threshold)
+        for key, metric, base, cur, ratio in flagged:
+            print(f"REGRESSION {key} {metric}: {base} -> {cur} (x{ratio:.2f})")
+        if flagged:
+            sys.exit(1)
+        print(f"No regressions vs {baseline_path} (threshold {args.threshold:.0%})")
+    else:
+        print(f"No baseline at {baseline_path}; run with --save-baseline to create one")
@@ -0,0 +1,230 @@
+# scripts/breakeven.py
+# Break-even and threshold solver: the inverse questions, for every catalog SKU x month at once
+# - Per-unit economics as (SKU x month) arrays: coins per month for 1 H/s from the monthly model's
+#   coin math (_monthly_coins, so emission schedules apply), scaled by each SKU's hashrate; kWh from
+#   the SKU's power; winter-only mining as in the model
+# - Closed form where the model is linear:
+#     breakeven_price       coin price at which a winter month's revenue == its power cost
+#     breakeven_elec_rate   $/kWh at which the month breaks even at the model's coin price
+#     breakeven_network_hs  network hashrate at which the month breaks even (coins ~ 1 / network),
+#                           scaled from the network projection the coins used (emission difficulty_step)
+#     payback               first month cumulative operating profit covers capex (unit price x units)
+# - Vectorized bisection (bisect) where it is not: breakeven_price_growth, the annual_price_pct at
+#   which a fleet pays back its capex by the end of the horizon; every SKU is bracketed and halved
+#   together, so the cost is ~50 array passes, not a model run per SKU per step
+# - Cash basis (--basis cash) sells coins by the treasury policy before summing profit
+# - Writes data/breakeven_by_month.csv (SKU x winter month) and data/breakeven_by_sku.csv
+
+import argparse
+import json
+import numpy as np
+from pathlib import Path
+
+from instrument import add_cli_args, configure_from_args, stage
+from miner_catalog import MinerCatalog
+from mining_core import _growth_curve, _month_calendar, _monthly_coins, _parse_hashrate, _validate_chain_conf
+from treasury import cash_sales, treasury_policy
+
+BASES = ("accrual", "cash")
+
+# ---------- Per-unit economics
+
+def _network_curve(conf: dict, per_hs: np.ndarray, cal: dict) -> np.ndarray:
+    """
+    Network hashrate (H/s) behind each month's coins. With an emission block the difficulty_step
+    (monthly, or per retarget epoch split inside a month) is read back from the coins themselves:
+    flat-difficulty coins / projected coins is the month's emission-weighted network growth.
+    """
+    net0 = _parse_hashrate(conf["network_hashrate"])
+    if "emission" not in conf:
+        return net0 * _growth_curve(float(conf.get("annual_difficulty_pct", 0.0)), cal["year_index"])
+    flat = _monthly_coins(dict(conf, units=1, annual_difficulty_pct=0.0), (1.0, "H/s", 0.0), cal)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return net0 * np.where(per_hs > 0, flat / per_hs, np.nan)
+
+def unit_economics(assumptions: dict, catalog: MinerCatalog) -> dict:
+    """
+    (SKU x month) per-unit arrays for every catalog row: coins, kwh, price, elec, network_hs,
+    plus per-SKU chain / model / j_per_th / unit price / units and base coin price (chain block).
+    """
+    cal = _month_calendar(assumptions["start_month"], assumptions["end_month"])
+    winter = list(assumptions.get("winter_months", [10,11,12,1,2,3,4]))
+    is_winter = np.isin(cal["month"], winter)
+    elec = float(assumptions.get("elec_rate_usd_per_kwh", 0.081)) * _growth_curve(
+        float(assumptions.get("annual_power_pct", 0.0)), cal["year_index"])
+
+    cols = catalog.columns
+    n, months = len(catalog), len(cal["period"])
+    coins = np.zeros((n, months))
+    price = np.zeros((n, months))
+    network = np.zeros((n, months))
+    units = np.zeros(n, dtype=np.int64)
+    base_price = np.zeros(n)
+    for chain in catalog.tables:
+        conf = assumptions[chain]
+        _validate_chain_conf(chain, conf)
+        rows = catalog.rows(chain)
+        # Coins for 1 H/s (linear in hashrate), then scaled by each SKU's hashrate
+        per_hs = _monthly_coins(dict(conf, units=1), (1.0, "H/s", 0.0), cal)
+        coins[rows] = cols["hashrate_hs"][rows, None] * np.where(is_winter, per_hs, 0.0)[None, :]
+        price[rows] = float(conf["base_price_usd"]) * _growth_curve(
+            float(conf.get("annual_price_pct", 0.0)), cal["year_index"])
+        network[rows] = _network_curve(conf, per_hs, cal)
+        units[rows] = int(conf["units"])
+        base_price[rows] = float(conf["base_price_usd"])
+    kwh = cols["power_w"][:, None] * 24 / 1000.0 * np.where(is_winter, cal["days"], 0)[None, :]
+    return {
+        "cal": cal,
+        "is_winter": is_winter,
+        "chain": cols["chain"],
+        "model": cols["model"],
+        "j_per_th": cols["j_per_th"],
+        "unit_price": cols["price_usd"],
+        "units": units,
+        "base_price": base_price,
+        "coins": coins,
+        "kwh": kwh,
+        "price": price,
+        "elec": np.broadcast_to(elec, coins.shape),
+        "network_hs": network,
+    }
+
+# ---------- Closed form
+
+def _ratio(numer: np.ndarray, denom: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denom > 0, numer / denom, np.nan)
+
+def breakeven_price(u: dict) -> np.ndarray:
+    """Coin price (USD) at which each SKU's winter month breaks even; NaN outside winter."""
+    return _ratio(u["kwh"] * u["elec"], u["coins"])
+
+def breakeven_elec_rate(u: dict) -> np.ndarray:
+    """Electricity rate (USD/kWh) at which each SKU's winter month breaks even."""
+    return _ratio(u["coins"] * u["price"], u["kwh"])
+
+def breakeven_network_hs(u: dict) -> np.ndarray:
+    """Network hashrate (H/s) at which each SKU's winter month breaks even (revenue ~ 1 / network)."""
+    return u["network_hs"] * _ratio(u["coins"] * u["price"], u["kwh"] * u["elec"])
+
+def fleet_profit(u: dict, price: np.ndarray = None, basis: str = "accrual", assumptions: dict = None) -> np.ndarray:
+    """(SKU x month) operating profit of each SKU's fleet (units from its chain block)."""
+    if basis not in BASES:
+        raise ValueError(f"basis must be one of {BASES}")
+    price = u["price"] if price is None else price
+    coins = u["coins"] * u["units"][:, None]
+    if basis == "accrual":
+        sales = coins * price
+    else:
+        sales = np.zeros_like(coins)
+        for chain in np.unique(u["chain"]):
+            rows = u["chain"] == chain
+            policy = treasury_policy(assumptions, assumptions[chain])
+            sales[rows] = cash_sales(coins[rows], price[rows], policy)
+    return sales - u["kwh"] * u["units"][:, None] * u["elec"]
+
+def payback(u: dict, basis: str = "accrual", assumptions: dict = None) -> tuple:
+    """(capex USD, payback month index or -1) per SKU: first month cumulative profit >= capex."""
+    capex = u["unit_price"] * u["units"]
+    cum = np.cumsum(fleet_profit(u, basis=basis, assumptions=assumptions), axis=1)
+    paid = cum >= capex[:, None]
+    month = np.where(paid.any(axis=1), paid.argmax(axis=1), -1)
+    return capex, np.where(np.isnan(capex), -1, month)
+
+# ---------- Vectorized root finding
+
+def bisect(f, lo: np.ndarray, hi: np.ndarray, tol: float = 1e-9, max_iter: int = 100) -> np.ndarray:
+    """
+    Roots of an increasing vectorized f (array -> array, elementwise) on [lo, hi], all at once.
+    NaN where f(lo) > 0 or f(hi) < 0 (no sign change in the bracket).
+    """
+    lo, hi = np.array(lo, dtype=float), np.array(hi, dtype=float)
+    f_lo, f_hi = f(lo), f(hi)
+    ok = (f_lo <= 0) & (f_hi >= 0)
+    for _ in range(max_iter):
+        mid = 0.5 * (lo + hi)
+        below = f(mid) < 0
+        lo = np.where(below, mid, lo)
+        hi = np.where(below, hi, mid)
+        if np.nanmax(np.where(ok, hi - lo, 0.0), initial=0.0) <= tol:
+            break
+    return np.where(ok, 0.5 * (lo + hi), np.nan)
+
+def breakeven_price_growth(u: dict, assumptions: dict, basis: str = "accrual",
+                           lo: float = -0.99, hi: float = 10.0) -> np.ndarray:
+    """annual_price_pct (fraction) at which each SKU's fleet pays back its capex by the horizon end."""
+    capex = u["unit_price"] * u["units"]
+    year_index = u["cal"]["year_index"]
+
+    def excess(g):
+        price = u["base_price"][:, None] * (1.0 + g[:, None]) ** year_index[None, :]
+        return fleet_profit(u, price, basis, assumptions).sum(axis=1) - capex
+
+    n = len(capex)
+    return bisect(excess, np.full(n, lo), np.full(n, hi), tol=1e-7)
+
+# ---------- CLI
+
+if __name__ == "__main__":
+    import pandas as pd
+
+    ap = argparse.ArgumentParser(description="Break-even price / power rate / network hashrate per SKU and month")
+    ap.add_argument("--basis", choices=BASES, default="accrual", help="profit basis for payback")
+    ap.add_argument("--elec-rate", type=float, default=None, help="override elec_rate_usd_per_kwh")
+    add_cli_args(ap)
+    args = ap.parse_args()
+    configure_from_args(args)
+
+    repo_root = Path(".")
+    conf_path = repo_root / "config" / "assumptions.json"
+    if not conf_path.exists():
+        raise SystemExit(f"Missing assumptions file: {conf_path}")
+    with stage("read_assumptions"):
+        assumptions = json.loads(conf_path.read_text())
+    if args.elec_rate is not None:
+        assumptions["elec_rate_usd_per_kwh"] = args.elec_rate
+
+    with stage("catalog") as rec:
+        catalog = MinerCatalog.from_assumptions(assumptions, repo_root)
+        rec["rows"] = len(catalog)
+    with stage("unit_economics"):
+        u = unit_economics(assumptions, catalog)
+    n, months = u["coins"].shape
+    winter = np.broadcast_to(u["is_winter"], (n, months))
+    by_month = pd.DataFrame({
+        "chain": np.repeat(u["chain"], months),
+        "model": np.repeat(u["model"], months),
+        "period": np.tile(u["cal"]["period"], n),
+        "coin_price_usd": u["price"].ravel(),
+        "breakeven_price_usd": breakeven_price(u).ravel(),
+        "elec_rate_usd_per_kwh": u["elec"].ravel(),
+        "breakeven_elec_usd_per_kwh": breakeven_elec_rate(u).ravel(),
+        "network_hs": u["network_hs"].ravel(),
+        "breakeven_network_hs": breakeven_network_hs(u).ravel(),
+    })[winter.ravel()]
+
+    with stage("payback", rows=n):
+        capex, month = payback(u, args.basis, assumptions)
+    with stage("price_growth", rows=n):
+        growth = breakeven_price_growth(u, assumptions, args.basis)
+    periods = np.asarray(u["cal"]["period"], dtype=object)
+    by_sku = pd.DataFrame({
+        "chain": u["chain"],
+        "model": u["model"],
+        "units": u["units"],
+        "j_per_th": u["j_per_th"],
+        "capex_usd": capex,
+        "first_month_breakeven_price_usd": breakeven_price(u)[:, u["is_winter"]][:, 0] if u["is_winter"].any() else np.nan,
+        "payback_month": np.where(month >= 0, periods[np.maximum(month, 0)], ""),
+        "payback_months": np.where(month >= 0, month + 1, np.nan),
+        "breakeven_price_growth_pct": 100.0 * growth,
+    })
+
+    (repo_root / "data").mkdir(parents=True, exist_ok=True)
+    money = {"coin_price_usd": 2, "breakeven_price_usd": 2, "capex_usd": 2,
+             "first_month_breakeven_price_usd": 2, "breakeven_price_growth_pct": 2}
+    for df, name in ((by_month, "breakeven_by_month.csv"), (by_sku, "breakeven_by_sku.csv")):
+        out = repo_root / "data" / name
+        with stage("write", rows=len(df)):
+            df.round(money).round(6).to_csv(out, index=False)
+        print(f"Wrote {out} ({len(df)} rows)")
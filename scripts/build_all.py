@@ -0,0 +1,83 @@
+# scripts/build_all.py
+# One-shot pipeline: monthly model -> annual accrual P&L + annual cash P&L
+# - Builds the monthly frame once, in full precision, and passes it in memory to both
+#   annual aggregations (no CSV round-trip, no rounding compounding between stages)
+# - Writes data/annual_pnl_accrual.csv and data/annual_pnl_cash.csv
+# - Writes data/monthly_model_2025_2030.csv only with --write-monthly (rounded as usual)
+# - With "chains"/"fleets" in assumptions the monthly stage is build_fleet_model.py summed per chain
+# - --format parquet|arrow writes columnar files instead of CSV (needs pyarrow)
+# - --profile / MINING_PROFILE: per-stage timings as JSON lines (see instrument.py)
+# - --cache skips stages whose inputs (miner CSVs, assumptions sub-trees) are unchanged
+
+import argparse
+import json
+from pathlib import Path
+
+from build_cache import BuildCache, stage_keys
+from build_fleet_model import build_fleet_model, chain_names, chain_totals, multi_fleet
+from build_monthly_model import build_monthly_model, round_monthly
+from build_annual_pnl_accrual import build_accrual
+from build_annual_pnl_cash import build_cash
+from instrument import add_cli_args, configure_from_args, stage
+from output_writer import FORMATS, write_frame
+
+def run_pipeline(assumptions: dict, repo_root: Path, cache: BuildCache = None) -> tuple:
+    """Return (monthly, accrual, cash) frames; monthly is unrounded. Stages with unchanged inputs come from `cache`."""
+    if multi_fleet(assumptions):
+        # chains/fleets config: sum the long fleet model into per-chain columns
+        def build_monthly():
+            long = build_fleet_model(assumptions, repo_root, round_output=False)
+            return chain_totals(long, chain_names(assumptions))
+    else:
+        def build_monthly():
+            return build_monthly_model(assumptions, repo_root, round_output=False, cache=cache)
+
+    if cache is None:
+        with stage("monthly"):
+            monthly = build_monthly()
+        with stage("accrual"):
+            accrual = build_accrual(assumptions, repo_root, monthly=monthly)
+        with stage("cash"):
+            cash = build_cash(assumptions, repo_root, monthly=monthly)
+        return monthly, accrual, cash
+
+    keys = stage_keys(assumptions, repo_root, round_output=False)
+    with stage("monthly"):
+        monthly = cache.fetch("monthly", keys["monthly"], build_monthly)
+    with stage("accrual"):
+        accrual = cache.fetch("accrual", keys["accrual"], lambda: build_accrual(assumptions, repo_root, monthly=monthly))
+    with stage("cash"):
+        cash = cache.fetch("cash", keys["cash"], lambda: build_cash(assumptions, repo_root, monthly=monthly))
+    return monthly, accrual, cash
+
+# ---------- CLI
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Build monthly model and both annual P&Ls in one process")
+    ap.add_argument("--write-monthly", action="store_true",
+                    help="also write data/monthly_model_2025_2030.csv")
+    ap.add_argument("--cache", nargs="?", const=".cache/builds", default=None, metavar="DIR",
+                    help="reuse stages whose inputs are unchanged (default dir: .cache/builds)")
+    ap.add_argument("--format", choices=list(FORMATS), default="csv")
+    add_cli_args(ap)
+    args = ap.parse_args()
+    configure_from_args(args)
+
+    repo_root = Path(".")
+    conf_path = repo_root / "config" / "assumptions.json"
+    if not conf_path.exists():
+        raise SystemExit(f"Missing assumptions file: {conf_path}")
+    with stage("read_assumptions"):
+        assumptions = json.loads(conf_path.read_text())
+    cache = BuildCache(repo_root / args.cache) if args.cache else None
+    monthly, accrual, cash = run_pipeline(assumptions, repo_root, cache=cache)
+    if cache is not None:
+        print(f"Cache: {cache.summary()}")
+
+    outputs = [(accrual, "annual_pnl_accrual.csv"), (cash, "annual_pnl_cash.csv")]
+    if args.write_monthly:
+        outputs.insert(0, (round_monthly(monthly.copy()), "monthly_model_2025_2030.csv"))
+    for df, name in outputs:
+        with stage(f"write:{name}", rows=len(df)):
+            out = write_frame(df, repo_root / "data" / name, args.format)
+        print(f"Wrote {out}")
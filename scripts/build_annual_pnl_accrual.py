@@ -1,29 +1,30 @@
+import argparse
 import json
 import pandas as pd
 import numpy as np
 from pathlib import Path
 
-MONEY_BASE = [
-    "btc_revenue_accrual", "etc_revenue_accrual",
-    "btc_power_cost", "etc_power_cost",
-]
+from build_fleet_model import chain_names
+from instrument import add_cli_args, configure_from_args, stage
+from output_writer import FORMATS, find_output, read_frame, write_frame
 
-def _round_money_and_totals(df: pd.DataFrame) -> pd.DataFrame:
+MONEY_BASE = ["revenue_accrual", "power_cost"]
+
+def _round_money_and_totals(df: pd.DataFrame, chains: list) -> pd.DataFrame:
     # Round base money first to avoid absurd % from penny-level denominators
-    for c in MONEY_BASE:
-        if c in df.columns:
-            df[c] = df[c].round(2)
+    for chain in chains:
+        for f in MONEY_BASE:
+            c = f"{chain}_{f}"
+            if c in df.columns:
+                df[c] = df[c].round(2)
 
     # Totals & profits (rounded)
-    df["total_revenue"] = (df.get("btc_revenue_accrual", 0.0) +
-                           df.get("etc_revenue_accrual", 0.0)).round(2)
-    df["total_power_cost"] = (df.get("btc_power_cost", 0.0) +
-                              df.get("etc_power_cost", 0.0)).round(2)
+    df["total_revenue"] = sum((df.get(f"{c}_revenue_accrual", 0.0) for c in chains), 0.0).round(2)
+    df["total_power_cost"] = sum((df.get(f"{c}_power_cost", 0.0) for c in chains), 0.0).round(2)
 
-    df["btc_operating_profit"] = (df.get("btc_revenue_accrual", 0.0) -
-                                  df.get("btc_power_cost", 0.0)).round(2)
-    df["etc_operating_profit"] = (df.get("etc_revenue_accrual", 0.0) -
-                                  df.get("etc_power_cost", 0.0)).round(2)
+    for c in chains:
+        df[f"{c}_operating_profit"] = (df.get(f"{c}_revenue_accrual", 0.0) -
+                                       df.get(f"{c}_power_cost", 0.0)).round(2)
     df["operating_profit_total"] = (df["total_revenue"] -
                                     df["total_power_cost"]).round(2)
     return df
@@ -37,50 +38,71 @@ def _safe_margin(numer: pd.Series, denom: pd.Series) -> pd.Series:
         index=numer.index
     ).round(2)
 
-def build_accrual(assumptions: dict, repo_root: Path) -> pd.DataFrame:
-    monthly_path = repo_root / "data" / "monthly_model_2025_2030.csv"
-    if not monthly_path.exists():
-        raise SystemExit(f"Missing monthly model CSV: {monthly_path}")
-
-    df = pd.read_csv(monthly_path)
-
+def build_accrual(assumptions: dict, repo_root: Path, monthly: pd.DataFrame = None) -> pd.DataFrame:
+    """Annual accrual P&L from `monthly` (in-memory frame) or, if not given, the monthly model on disk."""
     # Required columns
-    req = ["year", "btc_revenue_accrual", "etc_revenue_accrual",
-           "btc_power_cost", "etc_power_cost"]
+    chains = chain_names(assumptions)
+    req = (["year"] + [f"{c}_revenue_accrual" for c in chains]
+           + [f"{c}_power_cost" for c in chains])
+    if monthly is None:
+        stem = repo_root / "data" / "monthly_model_2025_2030"
+        monthly_path = find_output(stem)
+        if monthly_path is None:
+            raise SystemExit(f"Missing monthly model CSV: {stem.with_suffix('.csv')}")
+        # Columnar formats load only the columns needed here
+        with stage("read_monthly") as rec:
+            try:
+                df = read_frame(monthly_path, columns=req)
+            except (ValueError, KeyError) as e:
+                raise SystemExit(f"Monthly model missing column(s) {req}: {e}")
+            rec["rows"] = len(df)
+    else:
+        df = monthly
+
     for c in req:
         if c not in df.columns:
             raise SystemExit(f"Monthly model missing column: {c}")
 
-    g = df.groupby("year", as_index=False).agg({
-        "btc_revenue_accrual": "sum",
-        "etc_revenue_accrual": "sum",
-        "btc_power_cost": "sum",
-        "etc_power_cost": "sum",
-    })
+    with stage("groupby_year"):
+        g = df.groupby("year", as_index=False).agg({c: "sum" for c in req[1:]})
+
+    return finish_accrual(g, chains)
 
-    g = _round_money_and_totals(g)
+def finish_accrual(g: pd.DataFrame, chains: list) -> pd.DataFrame:
+    """Totals, profits and margins from final annual sums (keyed by year, or scenario + year)."""
+    with stage("totals"):
+        g = _round_money_and_totals(g, chains)
 
     # Margins (%)
-    g["btc_margin_pct"] = _safe_margin(g["btc_operating_profit"], g["btc_revenue_accrual"])
-    g["etc_margin_pct"] = _safe_margin(g["etc_operating_profit"], g["etc_revenue_accrual"])
+    for c in chains:
+        g[f"{c}_margin_pct"] = _safe_margin(g[f"{c}_operating_profit"], g[f"{c}_revenue_accrual"])
     g["margin_pct_total"] = _safe_margin(g["operating_profit_total"], g["total_revenue"])
 
-    cols = [
-        "year",
-        "btc_revenue_accrual", "etc_revenue_accrual", "total_revenue",
-        "btc_power_cost", "etc_power_cost", "total_power_cost",
-        "btc_operating_profit", "etc_operating_profit", "operating_profit_total",
-        "btc_margin_pct", "etc_margin_pct", "margin_pct_total",
-    ]
+    cols = (
+        [k for k in ("scenario", "year") if k in g.columns]
+        + [f"{c}_revenue_accrual" for c in chains] + ["total_revenue"]
+        + [f"{c}_power_cost" for c in chains] + ["total_power_cost"]
+        + [f"{c}_operating_profit" for c in chains] + ["operating_profit_total"]
+        + [f"{c}_margin_pct" for c in chains] + ["margin_pct_total"]
+    )
     return g[cols]
 
 if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Annual accrual P&L from the monthly model")
+    ap.add_argument("--format", choices=list(FORMATS), default="csv")
+    add_cli_args(ap)
+    args = ap.parse_args()
+    configure_from_args(args)
+
     repo_root = Path(".")
     conf_path = repo_root / "config" / "assumptions.json"
     if not conf_path.exists():
         raise SystemExit(f"Missing assumptions file: {conf_path}")
-    assumptions = json.loads(conf_path.read_text())
-    out = build_accrual(assumptions, repo_root)
-    out_path = repo_root / "data" / "annual_pnl_accrual.csv"
-    out.to_csv(out_path, index=False)
-    print(f"Wrote {out_path}")
\ No newline at end of file
+    with stage("read_assumptions"):
+        assumptions = json.loads(conf_path.read_text())
+    with stage("accrual") as rec:
+        out = build_accrual(assumptions, repo_root)
+        rec["rows"] = len(out)
+    with stage("write", rows=len(out)):
+        out_path = write_frame(out, repo_root / "data" / "annual_pnl_accrual.csv", args.format)
+    print(f"Wrote {out_path}")
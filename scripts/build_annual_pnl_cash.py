@@ -1,27 +1,28 @@
+import argparse
 import json
 import pandas as pd
 import numpy as np
 from pathlib import Path
 
-MONEY_BASE = [
-    "btc_cash_sales", "etc_cash_sales",
-    "btc_power_cost", "etc_power_cost",
-]
+from build_fleet_model import chain_names
+from instrument import add_cli_args, configure_from_args, stage
+from output_writer import FORMATS, find_output, read_frame, write_frame
 
-def _round_money_and_totals(df: pd.DataFrame) -> pd.DataFrame:
-    for c in MONEY_BASE:
-        if c in df.columns:
-            df[c] = df[c].round(2)
+MONEY_BASE = ["cash_sales", "power_cost"]
 
-    df["total_sales"] = (df.get("btc_cash_sales", 0.0) +
-                         df.get("etc_cash_sales", 0.0)).round(2)
-    df["total_power_cost"] = (df.get("btc_power_cost", 0.0) +
-                              df.get("etc_power_cost", 0.0)).round(2)
+def _round_money_and_totals(df: pd.DataFrame, chains: list) -> pd.DataFrame:
+    for chain in chains:
+        for f in MONEY_BASE:
+            c = f"{chain}_{f}"
+            if c in df.columns:
+                df[c] = df[c].round(2)
 
-    df["btc_operating_profit"] = (df.get("btc_cash_sales", 0.0) -
-                                  df.get("btc_power_cost", 0.0)).round(2)
-    df["etc_operating_profit"] = (df.get("etc_cash_sales", 0.0) -
-                                  df.get("etc_power_cost", 0.0)).round(2)
+    df["total_sales"] = sum((df.get(f"{c}_cash_sales", 0.0) for c in chains), 0.0).round(2)
+    df["total_power_cost"] = sum((df.get(f"{c}_power_cost", 0.0) for c in chains), 0.0).round(2)
+
+    for c in chains:
+        df[f"{c}_operating_profit"] = (df.get(f"{c}_cash_sales", 0.0) -
+                                       df.get(f"{c}_power_cost", 0.0)).round(2)
     df["operating_profit_total"] = (df["total_sales"] -
                                     df["total_power_cost"]).round(2)
     return df
@@ -34,55 +35,72 @@ def _safe_margin(numer: pd.Series, denom: pd.Series) -> pd.Series:
         index=numer.index
     ).round(2)
 
-def build_cash(assumptions: dict, repo_root: Path) -> pd.DataFrame:
-    monthly_path = repo_root / "data" / "monthly_model_2025_2030.csv"
-    if not monthly_path.exists():
-        raise SystemExit(f"Missing monthly model CSV: {monthly_path}")
-
-    df = pd.read_csv(monthly_path)
-
+def build_cash(assumptions: dict, repo_root: Path, monthly: pd.DataFrame = None) -> pd.DataFrame:
+    """Annual cash P&L from `monthly` (in-memory frame) or, if not given, the monthly model on disk."""
     # Required columns
-    req = ["year", "btc_cash_sales", "etc_cash_sales",
-           "btc_power_cost", "etc_power_cost"]
+    chains = chain_names(assumptions)
+    req = (["year"] + [f"{c}_cash_sales" for c in chains]
+           + [f"{c}_power_cost" for c in chains])
+    if monthly is None:
+        stem = repo_root / "data" / "monthly_model_2025_2030"
+        monthly_path = find_output(stem)
+        if monthly_path is None:
+            raise SystemExit(f"Missing monthly model CSV: {stem.with_suffix('.csv')}")
+        # Columnar formats load only the columns needed here
+        with stage("read_monthly") as rec:
+            try:
+                df = read_frame(monthly_path, columns=req)
+            except (ValueError, KeyError) as e:
+                raise SystemExit(f"Monthly model missing column(s) {req}: {e}")
+            rec["rows"] = len(df)
+    else:
+        df = monthly
+
     for c in req:
         if c not in df.columns:
             raise SystemExit(f"Monthly model missing column: {c}")
 
-    # Sum cash sales and power costs by calendar year
-    g_sales = df.groupby("year", as_index=False).agg({
-        "btc_cash_sales": "sum",
-        "etc_cash_sales": "sum",
-    })
-    g_power = df.groupby("year", as_index=False).agg({
-        "btc_power_cost": "sum",
-        "etc_power_cost": "sum",
-    })
+    # Sum cash sales and power costs by calendar year (one pass over the monthly rows)
+    with stage("groupby_year"):
+        g = df.groupby("year", as_index=False).agg({c: "sum" for c in req[1:]})
 
-    out = pd.merge(g_sales, g_power, on="year", how="outer").fillna(0.0)
+    return finish_cash(g, chains)
 
-    out = _round_money_and_totals(out)
+def finish_cash(g: pd.DataFrame, chains: list) -> pd.DataFrame:
+    """Totals, profits and margins from final annual sums (keyed by year, or scenario + year)."""
+    with stage("totals"):
+        out = _round_money_and_totals(g, chains)
 
     # Margins (%)
-    out["btc_margin_pct"] = _safe_margin(out["btc_operating_profit"], out["btc_cash_sales"])
-    out["etc_margin_pct"] = _safe_margin(out["etc_operating_profit"], out["etc_cash_sales"])
+    for c in chains:
+        out[f"{c}_margin_pct"] = _safe_margin(out[f"{c}_operating_profit"], out[f"{c}_cash_sales"])
     out["margin_pct_total"] = _safe_margin(out["operating_profit_total"], out["total_sales"])
 
-    cols = [
-        "year",
-        "btc_cash_sales", "etc_cash_sales", "total_sales",
-        "btc_power_cost", "etc_power_cost", "total_power_cost",
-        "btc_operating_profit", "etc_operating_profit", "operating_profit_total",
-        "btc_margin_pct", "etc_margin_pct", "margin_pct_total",
-    ]
+    cols = (
+        [k for k in ("scenario", "year") if k in out.columns]
+        + [f"{c}_cash_sales" for c in chains] + ["total_sales"]
+        + [f"{c}_power_cost" for c in chains] + ["total_power_cost"]
+        + [f"{c}_operating_profit" for c in chains] + ["operating_profit_total"]
+        + [f"{c}_margin_pct" for c in chains] + ["margin_pct_total"]
+    )
     return out[cols]
 
 if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Annual cash P&L from the monthly model")
+    ap.add_argument("--format", choices=list(FORMATS), default="csv")
+    add_cli_args(ap)
+    args = ap.parse_args()
+    configure_from_args(args)
+
     repo_root = Path(".")
     conf_path = repo_root / "config" / "assumptions.json"
     if not conf_path.exists():
         raise SystemExit(f"Missing assumptions file: {conf_path}")
-    assumptions = json.loads(conf_path.read_text())
-    out = build_cash(assumptions, repo_root)
-    out_path = repo_root / "data" / "annual_pnl_cash.csv"
-    out.to_csv(out_path, index=False)
-    print(f"Wrote {out_path}")
\ No newline at end of file
+    with stage("read_assumptions"):
+        assumptions = json.loads(conf_path.read_text())
+    with stage("cash") as rec:
+        out = build_cash(assumptions, repo_root)
+        rec["rows"] = len(out)
+    with stage("write", rows=len(out)):
+        out_path = write_frame(out, repo_root / "data" / "annual_pnl_cash.csv", args.format)
+    print(f"Wrote {out_path}")
@@ -0,0 +1,131 @@
+# scripts/build_cache.py
+# Content-addressed build cache for the model stages
+# - Each stage (specs, per-chain monthly arrays, monthly frame, accrual P&L, cash P&L) is keyed on
+#   sha256 of its inputs: miner CSV bytes, the relevant assumptions sub-tree, upstream stage keys
+# - Per-chain keys only cover that chain's block + the shared calendar/power knobs, so changing
+#   one chain's knobs reuses the other chain's work
+# - Entries are pickles under .cache/builds/<stage>-<key>.pkl; bump CACHE_VERSION when the
+#   model math changes so old entries stop matching
+# - MemoryCache: same fetch() interface, in-process LRU (for the long-running model service)
+
+import hashlib
+import json
+import os
+import pickle
+from collections import OrderedDict
+from pathlib import Path
+
+CACHE_VERSION = 2
+CHAINS = ("btc", "etc")
+
+# Global knobs the per-chain monthly arrays depend on (sell lag is applied at frame level)
+CALENDAR_KEYS = ("start_month", "end_month", "winter_months", "elec_rate_usd_per_kwh", "annual_power_pct")
+
+def file_digest(path: Path, chunk_size: int = 1 << 20) -> str:
+    """sha256 of a file's bytes."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def digest(*parts) -> str:
+    """sha256 over canonical JSON of `parts` (dict keys sorted)."""
+    payload = json.dumps([CACHE_VERSION, *parts], sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def stage_keys(assumptions: dict, repo_root: Path, round_output: bool = True) -> dict:
+    """Cache keys for every stage of the pipeline."""
+    calendar = {k: assumptions.get(k) for k in CALENDAR_KEYS}
+    keys = {"specs": {}, "chain": {}}
+    if "fleets" in assumptions or "chains" in assumptions:
+        # Multi-fleet model (build_fleet_model.py): one stage over the whole config + every sheet
+        # a fleet reads (chain block's source_csv unless the fleet overrides it)
+        from build_fleet_model import fleet_confs
+        sheets = {}
+        for fleet in fleet_confs(assumptions):
+            source = fleet["conf"]["source_csv"]
+            if source not in sheets:
+                csv_path = repo_root / source
+                if not csv_path.exists():
+                    raise FileNotFoundError(f"CSV not found: {csv_path}")
+                sheets[source] = file_digest(csv_path)
+        keys["monthly"] = digest("fleet_monthly", assumptions, sheets, round_output)
+        keys["accrual"] = digest("accrual", keys["monthly"])
+        keys["cash"] = digest("cash", keys["monthly"])
+        return keys
+    for name in CHAINS:
+        conf = assumptions[name]
+        csv_path = repo_root / conf["source_csv"]
+        if not csv_path.exists():
+            raise FileNotFoundError(f"CSV not found: {csv_path}")
+        specs_key = digest("specs", file_digest(csv_path), str(conf["model_name"]).strip().lower())
+        keys["specs"][name] = specs_key
+        keys["chain"][name] = digest("chain", specs_key, conf, calendar)
+    keys["monthly"] = digest("monthly", keys["chain"], assumptions.get("sell_lag_months", 12),
+                             assumptions.get("treasury"), round_output)
+    keys["accrual"] = digest("accrual", keys["monthly"])
+    keys["cash"] = digest("cash", keys["monthly"])
+    return keys
+
+class BuildCache:
+    """Pickle-per-entry cache directory; `fetch` returns the cached value or computes and stores it."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.hits = {}
+        self.misses = {}
+
+    def _path(self, stage: str, key: str) -> Path:
+        return self.root / f"{stage}-{key}.pkl"
+
+    def fetch(self, stage: str, key: str, compute):
+        path = self._path(stage, key)
+        if path.exists():
+            try:
+                with open(path, "rb") as f:
+                    value = pickle.load(f)
+                self.hits[stage] = self.hits.get(stage, 0) + 1
+                return value
+            except Exception:
+                # Corrupt/partial entry, or one pickled against code that has since changed
+                # (missing class/module, bad state): drop it and rebuild
+                path.unlink(missing_ok=True)
+        value = compute()
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(path)
+        self.misses[stage] = self.misses.get(stage, 0) + 1
+        return value
+
+    def summary(self) -> str:
+        stages = sorted(set(self.hits) | set(self.misses))
+        return ", ".join(f"{s}: {self.hits.get(s, 0)} hit / {self.misses.get(s, 0)} built" for s in stages)
+
+class MemoryCache:
+    """In-process LRU with BuildCache's fetch/summary interface; values are shared, not copied."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = {}
+        self.misses = {}
+
+    def fetch(self, stage: str, key: str, compute):
+        k = (stage, key)
+        if k in self.entries:
+            self.entries.move_to_end(k)
+            self.hits[stage] = self.hits.get(stage, 0) + 1
+            return self.entries[k]
+        value = compute()
+        self.entries[k] = value
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        self.misses[stage] = self.misses.get(stage, 0) + 1
+        return value
+
+    def summary(self) -> str:
+        stages = sorted(set(self.hits) | set(self.misses))
+        return ", ".join(f"{s}: {self.hits.get(s, 0)} hit / {self.misses.get(s, 0)} built" for s in stages)
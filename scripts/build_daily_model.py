@@ -0,0 +1,186 @@
+# scripts/build_daily_model.py
+# Daily / hourly engine with time-of-use electricity tariffs and curtailment
+# - Hour calendar for the whole horizon as NumPy arrays (hour of day, weekday, month position)
+# - Tariff: flat elec_rate_usd_per_kwh, optional seasonal rates by month, TOU bands by
+#   month / hour / weekday, monthly demand charge on peak kW; all scaled by annual_power_pct
+# - Curtailment policy decides which steps (hours or days) each fleet runs:
+#     "winter_only"     winter_months only, 100% uptime (same as build_monthly_model)
+#     "economic"        run when revenue for the step exceeds its energy cost
+#     "winter_economic" both conditions
+#     "none"            always on
+# - Rolls up to the same monthly columns as build_monthly_model
+#
+# Tariff block (optional, in assumptions.json):
+#   "tariff": {
+#     "seasons": [{"months": [6,7,8,9], "rate": 0.12}],
+#     "bands": [{"months": [12,1,2], "hours": [17,18,19,20], "weekdays_only": true, "rate": 0.15}],
+#     "demand_charge_usd_per_kw": 0.0
+#   },
+#   "curtailment": "winter_only"
+
+import argparse
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from build_monthly_model import round_monthly
+from instrument import add_cli_args, configure_from_args, stage
+from mining_core import (
+    CHAIN_FIELDS, _extract_specs, _growth_curve, _month_calendar, _monthly_coins, _validate_chain_conf,
+)
+from output_writer import FORMATS, write_frame
+from treasury import cash_sales, treasury_policy
+
+POLICIES = ("winter_only", "economic", "winter_economic", "none")
+RESOLUTIONS = ("hourly", "daily")
+
+# ---------- Calendar & tariff
+
+def _hour_calendar(start_month: str, end_month: str) -> dict:
+    """Every hour of the horizon: month position (into the month calendar), month, hour, weekday (Mon=0)."""
+    first = np.datetime64(start_month, "M")
+    hours = np.arange(first.astype("datetime64[h]"), (np.datetime64(end_month, "M") + 1).astype("datetime64[h]"))
+    days = hours.astype("datetime64[D]")
+    months = hours.astype("datetime64[M]")
+    return {
+        "month_pos": (months - first).astype(np.int64),
+        "month": months.astype(np.int64) % 12 + 1,
+        "hour": (hours - days).astype(np.int64),
+        "weekday": (days.astype(np.int64) + 3) % 7,  # 1970-01-01 was a Thursday
+    }
+
+def _hourly_rates(assumptions: dict, hcal: dict) -> np.ndarray:
+    """$/kWh for every hour before annual growth: base -> seasonal -> TOU bands (later bands win)."""
+    tariff = assumptions.get("tariff", {})
+    rate = np.full(len(hcal["hour"]), float(assumptions.get("elec_rate_usd_per_kwh", 0.081)))
+    for season in tariff.get("seasons", []):
+        rate[np.isin(hcal["month"], season["months"])] = float(season["rate"])
+    for band in tariff.get("bands", []):
+        mask = np.ones(len(rate), dtype=bool)
+        if "months" in band:
+            mask &= np.isin(hcal["month"], band["months"])
+        if "hours" in band:
+            mask &= np.isin(hcal["hour"], band["hours"])
+        if band.get("weekdays_only"):
+            mask &= hcal["weekday"] < 5
+        if band.get("weekends_only"):
+            mask &= hcal["weekday"] >= 5
+        rate[mask] = float(band["rate"])
+    return rate
+
+# ---------- Builder
+
+def build_daily_model(assumptions: dict, repo_root: Path, resolution: str = "hourly",
+                      policy: str = None, round_output: bool = True) -> pd.DataFrame:
+    """Simulate at hourly or daily steps under the tariff + curtailment policy; monthly roll-up frame."""
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"resolution must be one of {RESOLUTIONS}")
+    policy = policy or assumptions.get("curtailment", "winter_only")
+    if policy not in POLICIES:
+        raise ValueError(f"curtailment must be one of {POLICIES}")
+
+    cal = _month_calendar(assumptions["start_month"], assumptions["end_month"])
+    hcal = _hour_calendar(assumptions["start_month"], assumptions["end_month"])
+    winter = list(assumptions.get("winter_months", [10,11,12,1,2,3,4]))
+    power_growth = _growth_curve(float(assumptions.get("annual_power_pct", 0.0)), cal["year_index"])
+    demand_rate = float(assumptions.get("tariff", {}).get("demand_charge_usd_per_kw", 0.0)) * power_growth
+
+    rate = _hourly_rates(assumptions, hcal) * power_growth[hcal["month_pos"]]
+    step_hours = 1.0
+    month_pos = hcal["month_pos"]
+    if resolution == "daily":
+        # One decision per day at the day's average rate
+        rate = rate.reshape(-1, 24).mean(axis=1)
+        month_pos = month_pos[::24]
+        step_hours = 24.0
+    n_months = len(cal["period"])
+    is_winter_month = np.isin(cal["month"], winter)
+    winter_step = is_winter_month[month_pos]
+
+    cols = {
+        "period": cal["period"],
+        "year": cal["year"],
+        "month": cal["month"],
+        "is_winter": is_winter_month,
+    }
+    chains = {}
+    for name in ("btc", "etc"):
+        conf = assumptions[name]
+        _validate_chain_conf(name, conf)
+        per_unit_hash, unit_kind, power_w_each = _extract_specs(repo_root / conf["source_csv"], conf["model_name"])
+        units = int(conf["units"])
+
+        price = float(conf["base_price_usd"]) * _growth_curve(float(conf.get("annual_price_pct", 0.0)), cal["year_index"])
+        coins_hour = _monthly_coins(conf, (per_unit_hash, unit_kind, power_w_each), cal) / (cal["days"] * 24.0)
+        kw = units * power_w_each / 1000.0
+
+        coins_step = coins_hour[month_pos] * step_hours
+        revenue_step = coins_step * price[month_pos]
+        energy_cost_step = kw * step_hours * rate
+
+        if policy == "winter_only":
+            on = winter_step
+        elif policy == "economic":
+            on = revenue_step > energy_cost_step
+        elif policy == "winter_economic":
+            on = winter_step & (revenue_step > energy_cost_step)
+        else:
+            on = np.ones(len(rate), dtype=bool)
+
+        coins = np.bincount(month_pos, weights=np.where(on, coins_step, 0.0), minlength=n_months)
+        kwh = np.bincount(month_pos, weights=np.where(on, kw * step_hours, 0.0), minlength=n_months)
+        energy = np.bincount(month_pos, weights=np.where(on, energy_cost_step, 0.0), minlength=n_months)
+        ran = np.bincount(month_pos, weights=on.astype(float), minlength=n_months) > 0
+        demand = np.where(ran, kw * demand_rate, 0.0)
+
+        chains[name] = {
+            "model": conf["model_name"],
+            "units": units,
+            "unit_hash": per_unit_hash,
+            "unit_hash_unit": unit_kind,
+            "unit_power_w": power_w_each,
+            "coins_mined": coins,
+            "revenue_accrual": coins * price,
+            "kwh": kwh,
+            "power_cost": energy + demand,
+            "price_used": price,
+        }
+
+    for field in CHAIN_FIELDS:
+        for name, arrays in chains.items():
+            cols[f"{name}_{field}"] = arrays.get(field, 0.0)  # cash_sales filled below by treasury
+
+    df = pd.DataFrame(cols)
+
+    # Cash sales from the treasury policy (default: fixed 12-month lag)
+    for name, arrays in chains.items():
+        df[f"{name}_cash_sales"] = cash_sales(arrays["coins_mined"], arrays["price_used"],
+                                              treasury_policy(assumptions, assumptions[name]))
+
+    return round_monthly(df) if round_output else df
+
+# ---------- CLI
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Hourly/daily model with TOU tariffs, rolled up by month")
+    ap.add_argument("--resolution", choices=RESOLUTIONS, default="hourly")
+    ap.add_argument("--curtailment", choices=POLICIES, default=None,
+                    help="overrides assumptions['curtailment'] (default winter_only)")
+    ap.add_argument("--format", choices=list(FORMATS), default="csv")
+    add_cli_args(ap)
+    args = ap.parse_args()
+    configure_from_args(args)
+
+    repo_root = Path(".")
+    conf_path = repo_root / "config" / "assumptions.json"
+    if not conf_path.exists():
+        raise SystemExit(f"Missing assumptions file: {conf_path}")
+    with stage("read_assumptions"):
+        assumptions = json.loads(conf_path.read_text())
+    with stage("daily", resolution=args.resolution) as rec:
+        df = build_daily_model(assumptions, repo_root, resolution=args.resolution, policy=args.curtailment)
+        rec["rows"] = len(df)
+    with stage("write", rows=len(df)):
+        out = write_frame(df, repo_root / "data" / f"monthly_model_{args.resolution}_tou.csv", args.format)
+    print(f"Wrote {out}")
@@ -0,0 +1,197 @@
+# scripts/build_fleet_model.py
+# Multi-chain, multi-fleet monthly model (BTC + ETC together, or any other chains)
+# - Any number of chains (one assumptions block each, same keys as "btc"/"etc") and any number
+#   of fleets per chain; each fleet is a model + unit count (+ optional source_csv override)
+# - Long/tidy layout: every per-fleet quantity is a (fleet x month) array and the output has one
+#   row per fleet per month, so adding fleets adds rows, not columns
+# - Fleets share one optional power budget (power_budget_kw); when the running fleets draw more,
+#   uptime is allocated by "priority" (fleet list order) or "profit" (best margin per kW first,
+#   re-ranked every month; fleets with a negative margin stay off). The fleet at the edge of the
+#   budget runs partially. A budget needs this layout: the single btc + etc model rejects it
+# - chain_totals() sums fleets into the {chain}_* columns the annual P&L scripts read
+# - Without a "fleets" list, one fleet per chain is taken from the chain block's model_name/units,
+#   which reproduces build_monthly_model.py
+#
+# Assumptions (optional, in assumptions.json):
+#   "chains": ["btc", "etc"],
+#   "fleets": [
+#     {"chain": "btc", "model_name": "S21 Pro", "units": 4},
+#     {"chain": "btc", "model_name": "S21", "units": 2},
+#     {"chain": "etc", "model_name": "Jasminer X4-Q", "units": 20}
+#   ],
+#   "power_budget_kw": 30,
+#   "power_allocation": "priority"
+
+import argparse
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from build_monthly_model import round_monthly
+from mining_core import _extract_specs, _growth_curve, _month_calendar, _monthly_coins, _validate_chain_conf
+from output_writer import FORMATS, write_frame
+from treasury import cash_sales, treasury_policy
+
+ALLOCATIONS = ("priority", "profit")
+FLEET_FIELDS = ["coins_mined", "revenue_accrual", "kwh", "power_cost", "cash_sales"]
+
+# ---------- Config
+
+def multi_fleet(assumptions: dict) -> bool:
+    """True when assumptions use the chains/fleets layout (anything beyond one btc + one etc fleet)."""
+    return "fleets" in assumptions or "chains" in assumptions
+
+def chain_names(assumptions: dict) -> list:
+    """Chains in output order: "chains" if given, else first appearance in "fleets", else btc + etc."""
+    if "chains" in assumptions:
+        return list(assumptions["chains"])
+    if "fleets" in assumptions:
+        return list(dict.fromkeys(f["chain"] for f in assumptions["fleets"]))
+    return ["btc", "etc"]
+
+def fleet_confs(assumptions: dict) -> list:
+    """One merged config per fleet: the chain block overlaid with the fleet's own keys."""
+    chains = chain_names(assumptions)
+    fleets = assumptions.get("fleets")
+    if fleets is None:
+        fleets = [{"chain": c, "model_name": assumptions[c]["model_name"], "units": assumptions[c]["units"]}
+                  for c in chains]
+    if not fleets:
+        raise ValueError("fleets: at least one fleet is required")
+
+    confs, seen = [], set()
+    for i, fleet in enumerate(fleets):
+        chain = fleet.get("chain")
+        if chain not in chains:
+            raise ValueError(f"fleets[{i}]: chain '{chain}' is not one of {chains}")
+        if chain not in assumptions:
+            raise ValueError(f"fleets[{i}]: no '{chain}' block in assumptions")
+        conf = {**assumptions[chain], **{k: v for k, v in fleet.items() if k not in ("chain", "id")}}
+        fleet_id = str(fleet.get("id", f"{chain}:{conf.get('model_name', i)}"))
+        if fleet_id in seen:
+            fleet_id = f"{fleet_id}#{i}"
+        seen.add(fleet_id)
+        _validate_chain_conf(fleet_id, conf)
+        confs.append({"chain": chain, "id": fleet_id, "conf": conf})
+    return confs
+
+# ---------- Power budget
+
+def _allocate_uptime(kw: np.ndarray, running: np.ndarray, margin_per_kw: np.ndarray,
+                     budget_kw: float, allocation: str) -> np.ndarray:
+    """
+    (fleet x month) uptime in [0, 1]. Running fleets are powered in rank order until the budget
+    is used up; the first fleet that does not fit gets the remainder as fractional uptime.
+    "profit" gives no budget to fleets that would run at a loss (negative margin per kW).
+    """
+    n_fleets, n_months = running.shape
+    if budget_kw is None:
+        return running.astype(float)
+    if allocation == "priority":
+        order = np.broadcast_to(np.arange(n_fleets)[:, None], running.shape)
+    else:
+        running = running & (margin_per_kw >= 0)
+        order = np.argsort(-margin_per_kw, axis=0, kind="stable")
+    draw = np.where(running, kw[:, None], 0.0)
+    ranked = np.take_along_axis(draw, order, axis=0)
+    before = np.cumsum(ranked, axis=0) - ranked
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fit = np.where(ranked > 0, np.clip((budget_kw - before) / ranked, 0.0, 1.0), 1.0)
+    uptime = np.empty_like(fit)
+    np.put_along_axis(uptime, order, fit, axis=0)
+    return np.where(running, uptime, 0.0)
+
+# ---------- Builder
+
+def build_fleet_model(assumptions: dict, repo_root: Path, round_output: bool = True) -> pd.DataFrame:
+    """Long frame: one row per fleet per month (fleets in config order, months in calendar order)."""
+    cal = _month_calendar(assumptions["start_month"], assumptions["end_month"])
+    winter = list(assumptions.get("winter_months", [10,11,12,1,2,3,4]))
+    elec_curve = float(assumptions.get("elec_rate_usd_per_kwh", 0.081)) * _growth_curve(
+        float(assumptions.get("annual_power_pct", 0.0)), cal["year_index"])
+    allocation = assumptions.get("power_allocation", "priority")
+    if allocation not in ALLOCATIONS:
+        raise ValueError(f"power_allocation must be one of {ALLOCATIONS}")
+    budget_kw = assumptions.get("power_budget_kw")
+    if budget_kw is not None:
+        budget_kw = float(budget_kw)
+        if budget_kw < 0:
+            raise ValueError("power_budget_kw must be >= 0")
+
+    fleets = fleet_confs(assumptions)
+    n_fleets, n_months = len(fleets), len(cal["period"])
+    is_winter = np.isin(cal["month"], winter)
+
+    # Per-fleet specs and full-uptime curves, stacked into (fleet x month) arrays
+    specs = [_extract_specs(repo_root / f["conf"]["source_csv"], f["conf"]["model_name"]) for f in fleets]
+    units = np.array([int(f["conf"]["units"]) for f in fleets])
+    kw = units * np.array([s[2] for s in specs]) / 1000.0
+    coins_full = np.stack([_monthly_coins(f["conf"], s, cal) for f, s in zip(fleets, specs)])
+    price = np.stack([float(f["conf"]["base_price_usd"])
+                      * _growth_curve(float(f["conf"].get("annual_price_pct", 0.0)), cal["year_index"])
+                      for f in fleets])
+    kwh_full = kw[:, None] * 24.0 * cal["days"][None, :]
+
+    running = np.broadcast_to(is_winter, (n_fleets, n_months))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        margin_per_kw = (coins_full * price - kwh_full * elec_curve) / kwh_full
+    uptime = _allocate_uptime(kw, running, np.nan_to_num(margin_per_kw, nan=0.0), budget_kw, allocation)
+
+    coins = coins_full * uptime
+    revenue = coins * price
+    kwh = kwh_full * uptime
+    # Each fleet sells its own lots (fleet conf = chain block + fleet keys, so "treasury" can differ)
+    cash = np.stack([cash_sales(coins[i], price[i], treasury_policy(assumptions, f["conf"]))
+                     for i, f in enumerate(fleets)])
+
+    df = pd.DataFrame({
+        "period": np.tile(cal["period"], n_fleets),
+        "year": np.tile(cal["year"], n_fleets),
+        "month": np.tile(cal["month"], n_fleets),
+        "is_winter": np.tile(is_winter, n_fleets),
+        "chain": np.repeat([f["chain"] for f in fleets], n_months),
+        "fleet": np.repeat([f["id"] for f in fleets], n_months),
+        "model": np.repeat([f["conf"]["model_name"] for f in fleets], n_months),
+        "units": np.repeat(units, n_months),
+        "unit_hash": np.repeat([s[0] for s in specs], n_months),
+        "unit_hash_unit": np.repeat([s[1] for s in specs], n_months),
+        "unit_power_w": np.repeat([s[2] for s in specs], n_months),
+        "uptime": uptime.ravel(),
+        "coins_mined": coins.ravel(),
+        "revenue_accrual": revenue.ravel(),
+        "kwh": kwh.ravel(),
+        "power_cost": (kwh * elec_curve).ravel(),
+        "price_used": price.ravel(),
+        "cash_sales": cash.ravel(),
+    })
+    return round_monthly(df) if round_output else df
+
+def chain_totals(long: pd.DataFrame, chains: list = None) -> pd.DataFrame:
+    """Wide monthly frame with summed {chain}_{field} columns (and {chain}_units), one row per month."""
+    chains = chains or list(dict.fromkeys(long["chain"]))
+    base = long.drop_duplicates("period")[["period", "year", "month", "is_winter"]].reset_index(drop=True)
+    sums = long.groupby(["period", "chain"], sort=False)[["units"] + FLEET_FIELDS].sum().unstack("chain")
+    sums = sums.reindex(base["period"]).fillna(0)
+    cols = {c: base[c].to_numpy() for c in base.columns}
+    for field in ["units"] + FLEET_FIELDS:
+        for chain in chains:
+            cols[f"{chain}_{field}"] = sums[(field, chain)].to_numpy() if (field, chain) in sums else 0.0
+    return pd.DataFrame(cols)
+
+# ---------- CLI
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Multi-chain, multi-fleet monthly model (long layout)")
+    ap.add_argument("--assumptions", default="config/assumptions.json")
+    ap.add_argument("--format", choices=list(FORMATS), default="csv")
+    args = ap.parse_args()
+
+    repo_root = Path(".")
+    conf_path = repo_root / args.assumptions
+    if not conf_path.exists():
+        raise SystemExit(f"Missing assumptions file: {conf_path}")
+    assumptions = json.loads(conf_path.read_text())
+    df = build_fleet_model(assumptions, repo_root)
+    out = write_frame(df, repo_root / "data" / "fleet_model_monthly.csv", args.format)
+    print(f"Wrote {out} ({df['fleet'].nunique()} fleets, {df['chain'].nunique()} chains)")
@@ -0,0 +1,247 @@
+# scripts/capital.py
+# Capital layer on top of the annual P&L: capex, depreciation, salvage, attrition, payback, IRR, NPV
+# - Capex per chain = unit price from the miner sheet ("price" column, or unit_price_usd in the chain
+#   block) x units
+# - Depreciation: "straight_line" (capex - salvage over life_years, monthly in service, summed by
+#   calendar year) or "macrs" (IRS GDS half-year tables for 3/5/7-year property, by tax year)
+# - Attrition: attrition_pct_per_year of units fail, compounding; operating profit is scaled by the
+#   surviving fraction at mid-year, salvage by the fraction left at the end of the horizon
+# - Cash flows: -capex at the start, surviving operating profit at each calendar year end (time in
+#   years from the start month, so a partial first year is handled), salvage at the horizon end
+# - NPV / IRR / payback are computed on (scenarios x years) arrays: IRR is one vectorized bisection
+#   for every scenario at once (breakeven.bisect), so the layer costs a few array passes on a sweep
+#
+# Assumptions (optional; global block or per chain, chain wins):
+#   "capital": {"depreciation": "macrs", "life_years": 5, "salvage_pct": 0.1,
+#               "attrition_pct_per_year": 0.05, "discount_rate": 0.10, "basis": "cash"}
+
+import argparse
+import json
+import numpy as np
+from pathlib import Path
+
+from breakeven import bisect
+from instrument import add_cli_args, configure_from_args, stage
+from miner_catalog import MinerCatalog
+from mining_core import _month_calendar
+
+METHODS = ("straight_line", "macrs")
+BASES = ("accrual", "cash")
+# GDS half-year convention, percent of basis by tax year
+MACRS = {
+    3: [33.33, 44.45, 14.81, 7.41],
+    5: [20.00, 32.00, 19.20, 11.52, 11.52, 5.76],
+    7: [14.29, 24.49, 17.49, 12.49, 8.93, 8.92, 8.93, 4.46],
+}
+DEFAULTS = {
+    "depreciation": "straight_line",
+    "life_years": 4,
+    "salvage_pct": 0.0,
+    "attrition_pct_per_year": 0.0,
+    "discount_rate": 0.10,
+    "basis": "cash",
+}
+
+# ---------- Config
+
+def capital_conf(assumptions: dict, chain_conf: dict = None) -> dict:
+    """Effective capital settings for one chain: defaults <- assumptions["capital"] <- chain["capital"]."""
+    cfg = dict(DEFAULTS)
+    cfg.update(assumptions.get("capital", {}))
+    cfg.update((chain_conf or {}).get("capital", {}))
+    if cfg["depreciation"] not in METHODS:
+        raise ValueError(f"capital.depreciation must be one of {METHODS}")
+    if cfg["basis"] not in BASES:
+        raise ValueError(f"capital.basis must be one of {BASES}")
+    if cfg["depreciation"] == "macrs" and int(cfg["life_years"]) not in MACRS:
+        raise ValueError(f"capital: MACRS life_years must be one of {sorted(MACRS)}")
+    if float(cfg["life_years"]) <= 0:
+        raise ValueError("capital.life_years must be > 0")
+    for k in ("salvage_pct", "attrition_pct_per_year"):
+        if not 0.0 <= float(cfg[k]) < 1.0:
+            raise ValueError(f"capital.{k} must be in [0, 1)")
+    return cfg
+
+def unit_price(conf: dict, chain: str, catalog: MinerCatalog) -> float:
+    """Price of one unit: chain block's unit_price_usd, else the miner sheet's price column."""
+    if "unit_price_usd" in conf:
+        return float(conf["unit_price_usd"])
+    price = float(catalog.columns["price_usd"][catalog.lookup(chain, conf["model_name"])])
+    if not np.isfinite(price):
+        raise ValueError(f"{chain}: no price for '{conf['model_name']}' in the miner sheet; set unit_price_usd")
+    return price
+
+def year_times(months_per_year: np.ndarray) -> tuple:
+    """(mid, end) of each calendar year in the horizon, in years since the start month."""
+    end = np.cumsum(months_per_year) / 12.0
+    return end - months_per_year / 24.0, end
+
+# ---------- Schedules
+
+def depreciation(capex: np.ndarray, months_per_year: np.ndarray, cfg: dict) -> np.ndarray:
+    """(scenarios x years) depreciation expense."""
+    capex = np.atleast_1d(np.asarray(capex, dtype=float))
+    n_years = len(months_per_year)
+    if cfg["depreciation"] == "macrs":
+        pct = np.zeros(n_years)
+        table = MACRS[int(cfg["life_years"])][:n_years]
+        pct[:len(table)] = np.array(table) / 100.0
+        return capex[:, None] * pct[None, :]
+    life_months = float(cfg["life_years"]) * 12.0
+    served = np.minimum(np.cumsum(months_per_year), life_months)
+    per_month = capex * (1.0 - float(cfg["salvage_pct"])) / life_months
+    return per_month[:, None] * np.diff(served, prepend=0.0)[None, :]
+
+def npv(flows: np.ndarray, times: np.ndarray, rate) -> np.ndarray:
+    """NPV per row of (scenarios x periods) flows at `times` (years), rate scalar or per scenario."""
+    rate = np.asarray(rate, dtype=float).reshape(-1, 1)
+    return (flows / (1.0 + rate) ** times[None, :]).sum(axis=1)
+
+def irr(flows: np.ndarray, times: np.ndarray, lo: float = -0.99, hi: float = 10.0) -> np.ndarray:
+    """IRR per row (NaN when NPV does not change sign on [lo, hi]); conventional flows assumed."""
+    n = len(flows)
+    return bisect(lambda r: -npv(flows, times, r), np.full(n, lo), np.full(n, hi), tol=1e-10)
+
+def payback_index(profit: np.ndarray, capex: np.ndarray) -> np.ndarray:
+    """First period where cumulative profit covers capex, per row; -1 if never."""
+    paid = np.cumsum(profit, axis=1) >= np.asarray(capex, dtype=float)[:, None]
+    return np.where(paid.any(axis=1), paid.argmax(axis=1), -1)
+
+def capital_metrics(profit: np.ndarray, capex: np.ndarray, months_per_year: np.ndarray, cfg: dict) -> dict:
+    """
+    Capital layer for (scenarios x years) operating profit and per-scenario capex: per-year
+    surviving profit, depreciation, net income, book value, cash flow; per-scenario NPV, IRR,
+    payback year index and salvage.
+    """
+    profit = np.atleast_2d(np.asarray(profit, dtype=float))
+    capex = np.broadcast_to(np.asarray(capex, dtype=float), profit.shape[:1]).astype(float)
+    mid, end = year_times(np.asarray(months_per_year, dtype=float))
+    keep = 1.0 - float(cfg["attrition_pct_per_year"])
+    surviving = profit * keep ** mid[None, :]
+    dep = depreciation(capex, months_per_year, cfg)
+    salvage = capex * float(cfg["salvage_pct"]) * keep ** end[-1]
+
+    cash_flow = surviving.copy()
+    cash_flow[:, -1] += salvage
+    flows = np.hstack([-capex[:, None], cash_flow])
+    times = np.concatenate([[0.0], end])
+    return {
+        "operating_profit": surviving,
+        "depreciation": dep,
+        "net_income": surviving - dep,
+        "book_value": capex[:, None] - np.cumsum(dep, axis=1),
+        "cash_flow": cash_flow,
+        "salvage": salvage,
+        "npv": npv(flows, times, float(cfg["discount_rate"])),
+        "irr": irr(flows, times),
+        "payback_year": payback_index(surviving, capex),
+    }
+
+# ---------- Sweep layer
+
+def capital_from_sweep(sweep_df, assumptions: dict, catalog: MinerCatalog, chains=("btc", "etc")):
+    """Per-scenario, per-chain capital metrics for a run_sweep() frame (rows scenario-major, years tiled)."""
+    import pandas as pd
+
+    years = np.unique(sweep_df["year"].to_numpy())
+    n_years = len(years)
+    n_scen = len(sweep_df) // n_years
+    cal = _month_calendar(assumptions["start_month"], assumptions["end_month"])
+    months_per_year = np.bincount(np.searchsorted(years, cal["year"]), minlength=n_years).astype(float)
+    scen = sweep_df["scenario"].to_numpy()[::n_years]
+
+    parts = []
+    for chain in chains:
+        conf = assumptions[chain]
+        cfg = capital_conf(assumptions, conf)
+        profit = sweep_df[f"{chain}_{cfg['basis']}_operating_profit"].to_numpy().reshape(n_scen, n_years)
+        units_col = f"{chain}.units"
+        units = (sweep_df[units_col].to_numpy()[::n_years] if units_col in sweep_df
+                 else np.full(n_scen, float(conf["units"])))
+        capex = units * unit_price(conf, chain, catalog)
+        m = capital_metrics(profit, capex, months_per_year, cfg)
+        payback = m["payback_year"]
+        parts.append(pd.DataFrame({
+            "scenario": scen,
+            "chain": chain,
+            "capex_usd": np.round(capex, 2),
+            "npv_usd": np.round(m["npv"], 2),
+            "irr_pct": np.round(100.0 * m["irr"], 2),
+            "payback_year": np.where(payback >= 0, years[np.maximum(payback, 0)], -1),
+        }))
+    return pd.concat(parts, ignore_index=True).sort_values(["scenario", "chain"], kind="stable").reset_index(drop=True)
+
+# ---------- CLI
+
+if __name__ == "__main__":
+    import pandas as pd
+    from build_all import run_pipeline
+
+    ap = argparse.ArgumentParser(description="Capex, depreciation, payback, IRR and NPV per chain")
+    ap.add_argument("--assumptions", default="config/assumptions.json")
+    add_cli_args(ap)
+    args = ap.parse_args()
+    configure_from_args(args)
+
+    repo_root = Path(".")
+    conf_path = repo_root / args.assumptions
+    if not conf_path.exists():
+        raise SystemExit(f"Missing assumptions file: {conf_path}")
+    with stage("read_assumptions"):
+        assumptions = json.loads(conf_path.read_text())
+    chains = ("btc", "etc")
+    try:
+        with stage("catalog"):
+            catalog = MinerCatalog.from_assumptions(assumptions, repo_root, chains)
+        with stage("pipeline"):
+            monthly, accrual, cash = run_pipeline(assumptions, repo_root)
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    years = accrual["year"].to_numpy()
+    months_per_year = monthly.groupby("year").size().reindex(years).to_numpy().astype(float)
+    by_year = pd.DataFrame({"year": years})
+    summary = []
+    for chain in chains:
+        conf = assumptions[chain]
+        try:
+            cfg = capital_conf(assumptions, conf)
+            price = unit_price(conf, chain, catalog)
+        except ValueError as e:
+            raise SystemExit(str(e))
+        capex = price * int(conf["units"])
+        annual = accrual if cfg["basis"] == "accrual" else cash
+        with stage(f"capital:{chain}"):
+            m = capital_metrics(annual[f"{chain}_operating_profit"].to_numpy(), capex, months_per_year, cfg)
+        for k in ("operating_profit", "depreciation", "net_income", "book_value", "cash_flow"):
+            by_year[f"{chain}_{k}"] = m[k][0]
+
+        # Payback to the month, from the monthly model (same attrition curve)
+        sales = monthly[f"{chain}_{'revenue_accrual' if cfg['basis'] == 'accrual' else 'cash_sales'}"]
+        keep = 1.0 - float(cfg["attrition_pct_per_year"])
+        t = (np.arange(len(monthly)) + 0.5) / 12.0
+        month_profit = ((sales - monthly[f"{chain}_power_cost"]).to_numpy() * keep ** t)[None, :]
+        pay = payback_index(month_profit, [capex])[0]
+        summary.append({
+            "chain": chain,
+            "model": conf["model_name"],
+            "units": int(conf["units"]),
+            "unit_price_usd": price,
+            "capex_usd": capex,
+            "depreciation": cfg["depreciation"],
+            "life_years": cfg["life_years"],
+            "basis": cfg["basis"],
+            "discount_rate": cfg["discount_rate"],
+            "salvage_usd": m["salvage"][0],
+            "npv_usd": m["npv"][0],
+            "irr_pct": 100.0 * m["irr"][0],
+            "payback_month": monthly["period"].iloc[pay] if pay >= 0 else "",
+            "payback_months": pay + 1 if pay >= 0 else np.nan,
+        })
+
+    (repo_root / "data").mkdir(parents=True, exist_ok=True)
+    for df, name in ((by_year, "capital_by_year.csv"), (pd.DataFrame(summary), "capital_summary.csv")):
+        out = repo_root / "data" / name
+        with stage("write", rows=len(df)):
+            df.round(2).to_csv(out, index=False)
+        print(f"Wrote {out}")
@@ -1,89 +1,163 @@
 #!/usr/bin/env python3
 """
-Compare BTC vs ETC hashrates by normalizing units.
-- BTC sheet uses TH/s; ETC uses GH/s.
+Compare miner SKUs across the BTC and ETC sheets at current assumptions.
+- Units come from the miner catalog, which parses each sheet's headers once
+  ('hashrate(TH/s)' / 'hashrate (GH/s)', 'power(W)' / 'power (kW)', 'price'), so every
+  metric below is a column operation over the whole catalog (no per-row Python)
+- Per SKU: hashrate in TH/s and GH/s, J/TH, J/GH, $/TH, and per-unit revenue, power cost and net
+  $/day in the start month (network hashrate, coin price, emission and power rate from
+  config/assumptions.json), plus the break-even electricity rate for that day
+- Ranks: J/TH and $/TH within each chain (hashes are not comparable across algorithms),
+  net $/day across all SKUs
+- --sheet chain=path swaps in another sheet (e.g. a vendor feed with thousands of SKUs)
 Outputs:
-  reports/hash_compare.csv  (normalized table)
-  reports/hash_compare.md   (short human-readable summary)
+  reports/hash_compare.csv  (one row per SKU, best net $/day first)
+  reports/hash_compare.md   (short human-readable summary with top-N tables)
 """
-from pathlib import Path
+import argparse
+import json
+import numpy as np
 import pandas as pd
+from pathlib import Path
+
+from breakeven import breakeven_elec_rate
+from miner_catalog import MinerCatalog
+from mining_core import _month_calendar, _monthly_coins, _validate_chain_conf
 
 ROOT = Path(__file__).resolve().parents[1]
-DATA = ROOT / "data"
 REPORTS = ROOT / "reports"
-REPORTS.mkdir(exist_ok=True, parents=True)
 
-btc_path = DATA / "btc_miner_sheet.csv"
-etc_path = DATA / "etc_miner_sheet.csv"
+# (metric column, label, ascending) for the rank columns
+RANKS = (
+    ("J_per_TH", "J/TH", True),
+    ("usd_per_TH", "$/TH", True),
+    ("net_usd_per_day", "net $/day", False),
+)
+
+# ---------- Metrics
+
+def day_economics(assumptions: dict, catalog: MinerCatalog) -> dict:
+    """Per-SKU coins, kWh and coin price for one day of the start month (no winter mask)."""
+    start = assumptions["start_month"]
+    cal = _month_calendar(start, start)
+    n = len(catalog)
+    coins, price = np.zeros(n), np.zeros(n)
+    for chain in catalog.tables:
+        conf = assumptions[chain]
+        _validate_chain_conf(chain, conf)
+        rows = catalog.rows(chain)
+        # Coins for 1 H/s (linear in hashrate, emission schedule included), scaled per SKU
+        per_hs_day = _monthly_coins(dict(conf, units=1), (1.0, "H/s", 0.0), cal)[0] / cal["days"][0]
+        coins[rows] = catalog.columns["hashrate_hs"][rows] * per_hs_day
+        price[rows] = float(conf["base_price_usd"])
+    return {
+        "coins": coins,
+        "price": price,
+        "kwh": catalog.columns["power_w"] * 24 / 1000.0,
+        "elec": float(assumptions.get("elec_rate_usd_per_kwh", 0.081)),
+    }
+
+def compare_skus(assumptions: dict, catalog: MinerCatalog) -> pd.DataFrame:
+    """One row per catalog SKU: efficiency, cost per hash, daily economics, break-even rate, ranks."""
+    c = catalog.columns
+    th = c["hashrate_hs"] / 1e12
+    day = day_economics(assumptions, catalog)
+    revenue = day["coins"] * day["price"]
+    power_cost = day["kwh"] * day["elec"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        usd_per_th = np.where(th > 0, c["price_usd"] / th, np.nan)
+
+    df = pd.DataFrame({
+        "chain": c["chain"],
+        "model": c["model"],
+        "hashrate_THps": th,
+        "hashrate_GHps": c["hashrate_hs"] / 1e9,
+        "power (W)": c["power_w"],
+        "J_per_GH": c["j_per_th"] / 1000.0,
+        "J_per_TH": c["j_per_th"],
+        "price_usd": c["price_usd"],
+        "usd_per_TH": usd_per_th,
+        "revenue_usd_per_day": revenue,
+        "power_usd_per_day": power_cost,
+        "net_usd_per_day": revenue - power_cost,
+        "breakeven_elec_usd_per_kwh": breakeven_elec_rate(day),
+    })
+    for col, _, ascending in RANKS:
+        scores = df[col].where(np.isfinite(df[col]))
+        by = df["chain"] if col != "net_usd_per_day" else np.zeros(len(df))
+        df[f"rank_{col}"] = scores.groupby(by).rank(method="min", ascending=ascending).astype("Int64")
+    return df.sort_values(["net_usd_per_day", "chain", "model"], ascending=[False, True, True],
+                          kind="stable", na_position="last").reset_index(drop=True)
 
-btc = pd.read_csv(btc_path)
-etc = pd.read_csv(etc_path)
+# ---------- Report
+
+def _md_table(df: pd.DataFrame) -> list:
+    cells = df.astype(object).where(df.notna(), "").astype(str)
+    lines = ["| " + " | ".join(df.columns) + " |", "|" + "---|" * len(df.columns)]
+    lines += ["| " + " | ".join(r) + " |" for r in cells.to_numpy().tolist()]
+    return lines
+
+def render_summary(df: pd.DataFrame, assumptions: dict, sources: dict, top: int = 10) -> str:
+    """reports/hash_compare.md text."""
+    shown = ["chain", "model", "J_per_TH", "usd_per_TH", "net_usd_per_day", "breakeven_elec_usd_per_kwh"]
+    view = df[shown].round({"J_per_TH": 2, "usd_per_TH": 2, "net_usd_per_day": 2, "breakeven_elec_usd_per_kwh": 4})
+    profitable = int((df["net_usd_per_day"] > 0).sum())
+    lines = ["# Hashrate Comparison (normalized)", ""]
+    lines += [f"- Source: {Path(p).name} ({chain.upper()})" for chain, p in sources.items()]
+    lines += [
+        "- Hashrate normalized to TH/s and GH/s from each sheet's header unit; power to W.",
+        f"- Economics at {assumptions['start_month']}: power "
+        f"{float(assumptions.get('elec_rate_usd_per_kwh', 0.081)):.4f} $/kWh, coin prices "
+        + ", ".join(f"{chain.upper()} {float(assumptions[chain]['base_price_usd']):,.2f} USD" for chain in sources) + ".",
+        f"- Rows: {len(df)} ({profitable} with positive net $/day per unit)",
+        "",
+        f"## Top {top} by net $/day (per unit)",
+        "",
+    ]
+    lines += _md_table(view.head(top))
+    for col, label, _ in RANKS[:2]:
+        for chain in sources:
+            rank = df[f"rank_{col}"]
+            best = view[(df["chain"] == chain) & rank.notna()].assign(_r=rank).sort_values("_r", kind="stable")
+            lines += ["", f"## Top {top} {chain.upper()} by {label}", ""]
+            lines += _md_table(best.drop(columns="_r").head(top))
+    return "\n".join(lines) + "\n"
+
+# ---------- CLI
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Rank miner SKUs by J/TH, $/TH and net $/day at current assumptions")
+    ap.add_argument("--assumptions", default="config/assumptions.json")
+    ap.add_argument("--sheet", action="append", default=[], metavar="CHAIN=PATH",
+                    help="use another miner sheet for a chain (repeatable)")
+    ap.add_argument("--elec-rate", type=float, default=None, help="override elec_rate_usd_per_kwh")
+    ap.add_argument("--top", type=int, default=10, help="rows per table in the markdown summary")
+    args = ap.parse_args()
+
+    conf_path = ROOT / args.assumptions
+    if not conf_path.exists():
+        raise SystemExit(f"Missing assumptions file: {conf_path}")
+    assumptions = json.loads(conf_path.read_text())
+    if args.elec_rate is not None:
+        assumptions["elec_rate_usd_per_kwh"] = args.elec_rate
+    chains = ("btc", "etc")
+    sources = {c: ROOT / assumptions[c]["source_csv"] for c in chains}
+    for spec in args.sheet:
+        chain, sep, path = spec.partition("=")
+        if not sep or chain not in sources:
+            raise SystemExit(f"--sheet expects CHAIN=PATH with CHAIN in {chains}: {spec}")
+        sources[chain] = Path(path)
 
-# Expect columns: 'model', 'hashrate (TH/s)' on BTC; 'model', 'hashrate (GH/s)' on ETC
-def safe_num(x):
     try:
-        return float(x)
-    except Exception:
-        return float('nan')
-
-# Normalize
-btc_norm = btc.copy()
-if 'hashrate (TH/s)' in btc_norm.columns:
-    btc_norm['hashrate_GHps'] = btc_norm['hashrate (TH/s)'].apply(safe_num) * 1000.0
-    btc_norm['hashrate_THps'] = btc_norm['hashrate (TH/s)'].apply(safe_num)
-else:
-    btc_norm['hashrate_GHps'] = float('nan')
-    btc_norm['hashrate_THps'] = float('nan')
-
-etc_norm = etc.copy()
-if 'hashrate (GH/s)' in etc_norm.columns:
-    etc_norm['hashrate_GHps'] = etc_norm['hashrate (GH/s)'].apply(safe_num)
-    etc_norm['hashrate_THps'] = etc_norm['hashrate (GH/s)'].apply(safe_num) / 1000.0
-else:
-    etc_norm['hashrate_GHps'] = float('nan')
-    etc_norm['hashrate_THps'] = float('nan')
-
-# Add chain column & select core fields
-btc_sel = btc_norm.copy()
-btc_sel['chain'] = 'BTC'
-etc_sel = etc_norm.copy()
-etc_sel['chain'] = 'ETC'
-
-def pick_cols(df):
-    cols = []
-    for c in ['chain','model','hashrate (TH/s)','hashrate (GH/s)','hashrate_THps','hashrate_GHps','power (W)']:
-        if c in df.columns:
-            cols.append(c)
-    return df[cols]
-
-btc_out = pick_cols(btc_sel)
-etc_out = pick_cols(etc_sel)
-
-combined = pd.concat([btc_out, etc_out], ignore_index=True)
-
-# Efficiency (if power available)
-if 'power (W)' in combined.columns:
-    combined['J_per_GH'] = combined.apply(
-        lambda r: (float(r['power (W)']) / float(r['hashrate_GHps'])) if (pd.notna(r.get('power (W)')) and pd.notna(r.get('hashrate_GHps')) and r.get('hashrate_GHps') not in [0.0, 0]) else float('nan'),
-        axis=1
-    )
-    combined['J_per_TH'] = combined.apply(
-        lambda r: (float(r['power (W)']) / float(r['hashrate_THps'])) if (pd.notna(r.get('power (W)')) and pd.notna(r.get('hashrate_THps')) and r.get('hashrate_THps') not in [0.0, 0]) else float('nan'),
-        axis=1
-    )
-
-# Write CSV
-out_csv = REPORTS / "hash_compare.csv"
-combined.to_csv(out_csv, index=False)
-
-# Write simple MD
-lines = ["# Hashrate Comparison (normalized)\n",
-         f"- Source: {btc_path.name} (BTC) & {etc_path.name} (ETC)\n",
-         "- BTC TH/s → GH/s ×1000; ETC GH/s → TH/s ÷1000.\n",
-         f"- Rows: {len(combined)}\n"]
-md = "\n".join(lines)
-(out_md := REPORTS / "hash_compare.md").write_text(md)
-
-print(f"Wrote: {out_csv}")
-print(f"Wrote: {out_md}")
+        catalog = MinerCatalog.from_sheets(sources)
+        combined = compare_skus(assumptions, catalog)
+    except (ValueError, FileNotFoundError) as e:
+        raise SystemExit(str(e))
+
+    REPORTS.mkdir(exist_ok=True, parents=True)
+    out_csv = REPORTS / "hash_compare.csv"
+    combined.to_csv(out_csv, index=False)
+    (out_md := REPORTS / "hash_compare.md").write_text(render_summary(combined, assumptions, sources, args.top))
+
+    print(f"Wrote: {out_csv}")
+    print(f"Wrote: {out_md}")
@@ -0,0 +1,112 @@
+# scripts/emission.py
+# Emission schedule: block reward by height (BTC halvings, ETC 5M20 eras) and coins mined per month
+# - Reward eras are a precomputed lookup table (era start height, reward, cumulative supply), so
+#   cumulative emission E(h) at any (fractional) height is one vectorized index + multiply
+# - Month boundaries are projected to block heights from a known (height, date) anchor at the
+#   target block time; coins in a month = hashrate share * (E(h_end) - E(h_start)) * (1 - pool fee)
+# - Network hashrate projection ("difficulty_step"):
+#     "annual"  (1 + annual_difficulty_pct) ** calendar-year index (same as the monthly model)
+#     "monthly" compounded monthly
+#     "epoch"   constant per retarget epoch (epoch_blocks, default 2016); months are split at
+#               epoch boundaries and each piece uses its epoch's hashrate
+#
+# Chain block (optional, in assumptions.json):
+#   "emission": {"schedule": "btc_halving", "height": 917000, "height_date": "2025-10-01",
+#                "difficulty_step": "epoch"}
+# Custom schedules: {"initial_reward": 50, "era_blocks": 210000, "era_factor": 0.5, "first_height": 0}
+
+import numpy as np
+
+SCHEDULES = {
+    "btc_halving": {"initial_reward": 50.0, "era_blocks": 210000, "era_factor": 0.5, "first_height": 0},
+    # ECIP-1017: era 1 is blocks 1..5,000,000, reward cut 20% per era
+    "etc_5m20": {"initial_reward": 5.0, "era_blocks": 5000000, "era_factor": 0.8, "first_height": 1},
+}
+DIFFICULTY_STEPS = ("annual", "monthly", "epoch")
+SECONDS_PER_YEAR = 365.25 * 86400.0
+
+# ---------- Reward lookup table
+
+def _schedule(emission: dict) -> dict:
+    name = emission.get("schedule")
+    if name is not None and name not in SCHEDULES:
+        raise ValueError(f"Unknown emission schedule '{name}'. Available: {list(SCHEDULES)}")
+    sched = dict(SCHEDULES.get(name, {}))
+    sched.update({k: emission[k] for k in ("initial_reward", "era_blocks", "era_factor", "first_height") if k in emission})
+    missing = [k for k in ("initial_reward", "era_blocks", "era_factor") if k not in sched]
+    if missing:
+        raise ValueError(f"emission: missing {missing} (or set a known 'schedule')")
+    sched.setdefault("first_height", 0)
+    return sched
+
+def reward_table(emission: dict, max_height: float) -> dict:
+    """Era start heights, per-block reward and cumulative supply at each era start, up to max_height."""
+    sched = _schedule(emission)
+    era_blocks = int(sched["era_blocks"])
+    n_eras = int(max(max_height - sched["first_height"], 0) // era_blocks) + 2
+    k = np.arange(n_eras)
+    reward = float(sched["initial_reward"]) * float(sched["era_factor"]) ** k
+    return {
+        "first_height": float(sched["first_height"]),
+        "era_blocks": era_blocks,
+        "reward": reward,
+        "supply": np.concatenate([[0.0], np.cumsum(reward * era_blocks)[:-1]]),
+    }
+
+def cumulative_emission(table: dict, heights: np.ndarray) -> np.ndarray:
+    """Coins issued by blocks [first_height, h) for every h (fractional heights interpolate linearly)."""
+    h = np.maximum(np.asarray(heights, dtype=float) - table["first_height"], 0.0)
+    era = np.minimum((h // table["era_blocks"]).astype(np.int64), len(table["reward"]) - 1)
+    return table["supply"][era] + (h - era * table["era_blocks"]) * table["reward"][era]
+
+def block_reward_at(table: dict, heights: np.ndarray) -> np.ndarray:
+    h = np.maximum(np.asarray(heights, dtype=float) - table["first_height"], 0.0)
+    era = np.minimum((h // table["era_blocks"]).astype(np.int64), len(table["reward"]) - 1)
+    return table["reward"][era]
+
+# ---------- Month heights & coins
+
+def month_boundary_heights(emission: dict, block_time_s: float, period: np.ndarray) -> np.ndarray:
+    """Projected block height at the start of every month plus the end of the last (len + 1)."""
+    if "height" not in emission:
+        raise ValueError("emission: 'height' (block height at height_date) is required")
+    starts = np.asarray(period, dtype="datetime64[D]")
+    bounds = np.append(starts, (starts[-1].astype("datetime64[M]") + 1).astype("datetime64[D]"))
+    anchor = np.datetime64(emission.get("height_date", str(starts[0])), "D")
+    seconds = (bounds - anchor).astype(np.int64) * 86400.0
+    return float(emission["height"]) + seconds / float(block_time_s)
+
+def monthly_coins(conf: dict, my_hs: float, net_hs: float, cal: dict) -> np.ndarray:
+    """Coins mined per calendar month by a fleet of my_hs H/s (full months, before any uptime mask)."""
+    emission = conf["emission"]
+    step = emission.get("difficulty_step", "annual")
+    if step not in DIFFICULTY_STEPS:
+        raise ValueError(f"emission.difficulty_step must be one of {DIFFICULTY_STEPS}")
+    growth = 1.0 + float(conf.get("annual_difficulty_pct", 0.0))
+    fee = float(conf.get("pool_fee_pct", 0.0))
+    block_time = float(conf["block_time_s"])
+
+    bounds = month_boundary_heights(emission, block_time, cal["period"])
+    table = reward_table(emission, bounds[-1])
+
+    if step != "epoch":
+        if step == "annual":
+            net = net_hs * growth ** cal["year_index"]
+        else:
+            net = net_hs * growth ** (np.arange(len(bounds) - 1) / 12.0)
+        emitted = np.diff(cumulative_emission(table, bounds))
+        return (my_hs / net) * emitted * (1.0 - fee)
+
+    # Split months at retarget boundaries; each piece uses its epoch's projected hashrate
+    epoch_blocks = float(emission.get("epoch_blocks", 2016))
+    first_epoch = np.ceil(bounds[0] / epoch_blocks)
+    epoch_edges = np.arange(first_epoch, np.floor(bounds[-1] / epoch_blocks) + 1) * epoch_blocks
+    edges = np.union1d(bounds, epoch_edges)
+    a, b = edges[:-1], edges[1:]
+    month = np.searchsorted(bounds, a, side="right") - 1
+    epoch_start = np.floor(a / epoch_blocks) * epoch_blocks
+    years = np.maximum(epoch_start - float(emission["height"]), 0.0) * block_time / SECONDS_PER_YEAR
+    net = net_hs * growth ** years
+    emitted = cumulative_emission(table, b) - cumulative_emission(table, a)
+    coins = (my_hs / net) * emitted * (1.0 - fee)
+    return np.bincount(month, weights=coins, minlength=len(bounds) - 1)
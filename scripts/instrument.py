@@ -0,0 +1,155 @@
+# scripts/instrument.py
+# Opt-in stage instrumentation: per-stage timings, row counts and memory deltas as JSON lines
+# - Off by default; `with stage(...)` then costs one dict and one branch
+# - Enable with the MINING_PROFILE env var ("1"/"stderr" or a .jsonl path to append to) or
+#   --profile [PATH] on the CLIs
+# - One JSON object per stage when it ends: stage (nested names joined by "/"), script, seconds,
+#   rows (when the stage sets it), rss_mb and rss_delta_mb (Linux /proc; null elsewhere)
+# - Deep dive on one stage: MINING_PROFILE_STAGE=<name> (full or last path part) with
+#   MINING_PROFILE_MODE=cprofile (writes <name>.prof next to the log, top functions in the record)
+#   or tracemalloc (peak MB + top allocation sites in the record); CLI: --profile-stage / --profile-mode
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+MODES = ("cprofile", "tracemalloc")
+ENV_OUT = "MINING_PROFILE"
+ENV_STAGE = "MINING_PROFILE_STAGE"
+ENV_MODE = "MINING_PROFILE_MODE"
+
+_STATE = {"out": None, "stage": None, "mode": "cprofile", "stack": []}
+_PAGE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+def configure(out=None, stage: str = None, mode: str = "cprofile"):
+    """Turn instrumentation on (out: "stderr" or a path) or off (out=None)."""
+    if mode not in MODES:
+        raise ValueError(f"profile mode must be one of {MODES}")
+    _STATE.update({"out": out, "stage": stage, "mode": mode})
+
+def configure_from_env():
+    out = os.environ.get(ENV_OUT, "").strip()
+    if out and out.lower() not in ("0", "false", "no"):
+        mode = os.environ.get(ENV_MODE, "cprofile").strip() or "cprofile"
+        if mode not in MODES:
+            # Runs at import: a typo in the environment must not break every script
+            print(f"instrument: ignoring {ENV_MODE}={mode!r} (expected one of {MODES}), using cprofile",
+                  file=sys.stderr)
+            mode = "cprofile"
+        configure("stderr" if out.lower() in ("1", "true", "yes", "stderr") else out,
+                  os.environ.get(ENV_STAGE) or None, mode)
+
+def enabled() -> bool:
+    return _STATE["out"] is not None
+
+def add_cli_args(ap):
+    """--profile / --profile-stage / --profile-mode on an argparse parser."""
+    ap.add_argument("--profile", nargs="?", const="stderr", default=None, metavar="PATH",
+                    help="emit per-stage JSON lines to stderr or append them to PATH")
+    ap.add_argument("--profile-stage", default=None, help="wrap one stage in cProfile/tracemalloc")
+    ap.add_argument("--profile-mode", choices=MODES, default="cprofile")
+
+def configure_from_args(args):
+    """Apply the add_cli_args flags (the env vars still apply when --profile is absent)."""
+    if args.profile is not None:
+        configure(args.profile, args.profile_stage, args.profile_mode)
+    elif enabled() and args.profile_stage:
+        configure(_STATE["out"], args.profile_stage, args.profile_mode)
+
+# ---------- Recording
+
+def _rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE / 2**20
+    except (OSError, ValueError, IndexError):
+        return None
+
+def _emit(record: dict):
+    line = json.dumps(record, default=str)
+    if _STATE["out"] == "stderr":
+        print(line, file=sys.stderr)
+    else:
+        path = Path(_STATE["out"])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a") as f:
+            f.write(line + "\n")
+
+def _targeted(name: str) -> bool:
+    target = _STATE["stage"]
+    return target is not None and (target == name or target == name.rsplit("/", 1)[-1])
+
+def _profile_path(name: str) -> Path:
+    base = Path(".") if _STATE["out"] == "stderr" else Path(_STATE["out"]).parent
+    return base / f"{name.replace('/', '.')}.prof"
+
+@contextmanager
+def stage(name: str, **fields):
+    """
+    Time the enclosed block as one stage. Yields a dict the block can add fields to
+    (e.g. rec["rows"] = len(df)); they are written with the record.
+    """
+    rec = dict(fields)
+    if not enabled():
+        yield rec
+        return
+
+    stack = _STATE["stack"]
+    stack.append(name)
+    full = "/".join(stack)
+    deep = _STATE["mode"] if _targeted(full) else None
+    prof = None
+    started_tracing = False
+    if deep == "cprofile":
+        prof = cProfile.Profile()
+    elif deep == "tracemalloc":
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(10)
+        tracemalloc.reset_peak()
+        snap_before = tracemalloc.take_snapshot()
+    rss0 = _rss_mb()
+    t0 = time.perf_counter()
+    if prof is not None:
+        prof.enable()
+    try:
+        yield rec
+    finally:
+        if prof is not None:
+            prof.disable()
+        seconds = time.perf_counter() - t0
+        rss1 = _rss_mb()
+        record = {
+            "stage": full,
+            "script": Path(sys.argv[0]).name,
+            "seconds": round(seconds, 6),
+            "rows": None,
+            "rss_mb": None if rss1 is None else round(rss1, 3),
+            "rss_delta_mb": None if rss0 is None or rss1 is None else round(rss1 - rss0, 3),
+        }
+        record.update(rec)
+        if prof is not None:
+            path = _profile_path(full)
+            prof.dump_stats(path)
+            buf = io.StringIO()
+            pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(10)
+            record["profile"] = str(path)
+            record["profile_top"] = [l.strip() for l in buf.getvalue().splitlines() if l.strip()][-10:]
+        elif deep == "tracemalloc":
+            _, peak = tracemalloc.get_traced_memory()
+            diff = tracemalloc.take_snapshot().compare_to(snap_before, "lineno")
+            record["py_peak_mb"] = round(peak / 2**20, 3)
+            record["top_allocations"] = [str(d) for d in diff[:5]]
+            if started_tracing:
+                tracemalloc.stop()
+        stack.pop()
+        _emit(record)
+
+configure_from_env()
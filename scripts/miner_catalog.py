@@ -0,0 +1,214 @@
+# scripts/miner_catalog.py
+# Miner catalog: the miner sheets parsed once into typed, unit-normalized columns
+# - Header parsing: "hashrate(TH/s)", "hashrate (GH/s)", "power(W)", "power (kW)", "price", plus
+#   vendor-feed spellings ("Hash Rate [TH/s]", "Power [kW]", "Price (USD)"); a bare "hashrate"
+#   header is raw H/s, as before the catalog
+#   (ratio columns such as "hashrate(TH/s)/power(W)" are not mistaken for the hashrate column)
+# - Normalized units: hashrate_hs (H/s), power_w (W), j_per_th (J/TH), price_usd
+# - O(1) case-insensitive model index per sheet
+# - Parsed sheets are memoized per process and serialized to .cache/catalog/<sha256>.pkl,
+#   so a sheet is only parsed again when its bytes change
+# - stdlib + numpy only (no pandas needed to look up specs)
+
+import csv
+import hashlib
+import os
+import pickle
+import re
+import numpy as np
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_CACHE_DIR = ROOT / ".cache" / "catalog"
+CATALOG_VERSION = 1
+
+HASH_PREFIX = {"": 1.0, "K": 1e3, "M": 1e6, "G": 1e9, "T": 1e12, "P": 1e15, "E": 1e18}
+
+# A bare "hashrate" header (no unit) is raw H/s, as in the original per-model reader
+_HASHRATE_HDR = re.compile(r"^\s*hash[\s_]*rate\s*(?:[(\[]?\s*([kmgtpe]?)h/s\s*[)\]]?)?\s*$", re.I)
+_POWER_HDR = re.compile(r"^\s*power\s*[(\[]\s*(k?)w\s*[)\]]\s*$", re.I)
+_PRICE_HDR = re.compile(r"^\s*price(\s*[(\[]\s*(usd|\$)\s*[)\]])?\s*$", re.I)
+
+_SHEET_MEMO = {}
+
+# ---------- Sheet parsing
+
+def _num(s: str) -> float:
+    try:
+        return float(str(s).replace(",", "").replace("$", "").strip())
+    except ValueError:
+        return float("nan")
+
+def _find_columns(header: list, name: str) -> dict:
+    """Locate model / hashrate / power / price columns and their units from the header row."""
+    cols = {"model": 0, "price": None}
+    for i, h in enumerate(header):
+        if str(h).strip().lower() == "model":
+            cols["model"] = i
+            break
+    for i, h in enumerate(header):
+        m = _HASHRATE_HDR.match(h)
+        if m and "hashrate" not in cols:
+            cols["hashrate"] = i
+            cols["prefix"] = (m.group(1) or "").upper()
+            cols["unit_kind"] = f"{cols['prefix']}H/s"
+        m = _POWER_HDR.match(h)
+        if m and "power" not in cols:
+            cols["power"] = i
+            cols["power_scale"] = 1000.0 if m.group(1) else 1.0
+        if cols["price"] is None and _PRICE_HDR.match(h):
+            cols["price"] = i
+    if "hashrate" not in cols:
+        raise ValueError(f"No hashrate column found in {name}")
+    if "power" not in cols:
+        raise ValueError(f"No power (W) column found in {name}")
+    return cols
+
+def _parse_sheet(text: str, name: str) -> dict:
+    """Columnar table for one miner sheet."""
+    rows = list(csv.reader(text.splitlines()))
+    if not rows:
+        raise ValueError(f"Empty miner sheet: {name}")
+    cols = _find_columns(rows[0], name)
+    body = [r for r in rows[1:] if any(cell.strip() for cell in r)]
+
+    def column(i):
+        return [r[i] if i is not None and i < len(r) else "" for r in body]
+
+    models = np.array([m.strip() for m in column(cols["model"])], dtype=object)
+    unit_hash = np.array([_num(v) for v in column(cols["hashrate"])])
+    power_w = np.array([_num(v) for v in column(cols["power"])]) * cols["power_scale"]
+    price = np.array([_num(v) for v in column(cols["price"])])
+    hashrate_hs = unit_hash * HASH_PREFIX[cols["prefix"]]
+
+    index = {}
+    for i, m in enumerate(models):
+        if m:
+            index.setdefault(m.lower(), i)  # first match wins, like the old row mask
+    with np.errstate(divide="ignore", invalid="ignore"):
+        j_per_th = np.where(hashrate_hs > 0, power_w / (hashrate_hs / 1e12), np.nan)
+    return {
+        "source": name,
+        "model": models,
+        "unit_hash": unit_hash,
+        "unit_kind": cols["unit_kind"],
+        "hashrate_hs": hashrate_hs,
+        "power_w": power_w,
+        "j_per_th": j_per_th,
+        "price_usd": price,
+        "index": index,
+    }
+
+def read_sheet(csv_path: Path, cache_dir: Path = DEFAULT_CACHE_DIR) -> dict:
+    """Parsed sheet table; memoized per process (path + mtime + size) and on disk (content hash)."""
+    csv_path = Path(csv_path)
+    if not csv_path.exists():
+        raise FileNotFoundError(f"CSV not found: {csv_path}")
+    st = csv_path.stat()
+    memo_key = (str(csv_path.resolve()), st.st_mtime_ns, st.st_size)
+    table = _SHEET_MEMO.get(memo_key)
+    if table is not None:
+        return table
+
+    raw = csv_path.read_bytes()
+    cache_path = None
+    if cache_dir is not None:
+        digest = hashlib.sha256(raw).hexdigest()
+        cache_path = Path(cache_dir) / f"v{CATALOG_VERSION}-{digest}.pkl"
+        if cache_path.exists():
+            try:
+                with open(cache_path, "rb") as f:
+                    table = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                table = None
+
+    if table is None:
+        table = _parse_sheet(raw.decode("utf-8-sig"), csv_path.name)
+        if cache_path is not None:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp, "wb") as f:
+                pickle.dump(table, f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp.replace(cache_path)
+
+    table = dict(table, source=csv_path.name)
+    _SHEET_MEMO[memo_key] = table
+    return table
+
+def lookup(table: dict, model_name: str) -> int:
+    """Row of `model_name` (case-insensitive); ValueError listing the sheet's models if absent."""
+    i = table["index"].get(str(model_name).strip().lower())
+    if i is None:
+        raise ValueError(
+            f"Model '{model_name}' not found in {table['source']}. "
+            f"Available: {[m for m in table['model'] if m]}"
+        )
+    return i
+
+def sheet_specs(csv_path: Path, model_name: str) -> tuple:
+    """(per-unit hashrate in the sheet's unit, unit kind, power W) for one model."""
+    table = read_sheet(csv_path)
+    i = lookup(table, model_name)
+    return float(table["unit_hash"][i]), table["unit_kind"], float(table["power_w"][i])
+
+# ---------- Multi-sheet catalog
+
+class MinerCatalog:
+    """Concatenated sheets, one row per SKU, tagged with its chain; O(1) (chain, model) index."""
+
+    FIELDS = ("model", "unit_hash", "hashrate_hs", "power_w", "j_per_th", "price_usd")
+
+    def __init__(self, sheets: dict):
+        self.tables = sheets
+        parts = {f: [] for f in self.FIELDS}
+        chain, unit_kind, self.index = [], [], {}
+        offset = 0
+        for name, table in sheets.items():
+            n = len(table["model"])
+            for f in self.FIELDS:
+                parts[f].append(table[f])
+            chain += [name] * n
+            unit_kind += [table["unit_kind"]] * n
+            for key, i in table["index"].items():
+                self.index[(name, key)] = offset + i
+            offset += n
+        self.columns = {f: np.concatenate(v) if v else np.array([]) for f, v in parts.items()}
+        self.columns["chain"] = np.array(chain, dtype=object)
+        self.columns["unit_kind"] = np.array(unit_kind, dtype=object)
+
+    @classmethod
+    def from_sheets(cls, paths: dict, cache_dir: Path = DEFAULT_CACHE_DIR) -> "MinerCatalog":
+        return cls({name: read_sheet(Path(p), cache_dir) for name, p in paths.items()})
+
+    @classmethod
+    def from_assumptions(cls, assumptions: dict, repo_root: Path, chains=("btc", "etc")) -> "MinerCatalog":
+        return cls.from_sheets({c: Path(repo_root) / assumptions[c]["source_csv"] for c in chains})
+
+    def __len__(self) -> int:
+        return len(self.columns["model"])
+
+    def lookup(self, chain: str, model_name: str) -> int:
+        """Catalog row of (chain, model_name), case-insensitive."""
+        if chain not in self.tables:
+            raise KeyError(f"Unknown chain '{chain}'. Available: {list(self.tables)}")
+        i = self.index.get((chain, str(model_name).strip().lower()))
+        if i is None:
+            lookup(self.tables[chain], model_name)  # raises with the available models
+        return i
+
+    def specs(self, chain: str, model_name: str) -> tuple:
+        i = self.lookup(chain, model_name)
+        c = self.columns
+        return float(c["unit_hash"][i]), c["unit_kind"][i], float(c["power_w"][i])
+
+    def rows(self, chain: str = None) -> np.ndarray:
+        """Row indices for one chain (all rows if chain is None)."""
+        if chain is None:
+            return np.arange(len(self))
+        return np.flatnonzero(self.columns["chain"] == chain)
+
+    def to_frame(self):
+        """pandas view of the catalog (pandas imported lazily)."""
+        import pandas as pd
+        cols = ["chain", "model", "unit_hash", "unit_kind", "hashrate_hs", "power_w", "j_per_th", "price_usd"]
+        return pd.DataFrame({c: self.columns[c] for c in cols})
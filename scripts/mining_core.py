@@ -0,0 +1,381 @@
+# scripts/mining_core.py
+# Core mining economics without pandas: stdlib + NumPy only, so a cold start skips the pandas import
+# - Hashrate parsing, fleet hashrate, coins/day, month calendar, growth curves, per-chain monthly
+#   arrays (moved here from build_monthly_model.py, which re-exports them)
+# - monthly_columns(): the whole monthly model as {column: array}; build_monthly_model() wraps it
+#   in a DataFrame, and the sell lag / policy comes from treasury.py
+# - annual_pnl(): accrual / cash annual roll-up with the same rounding, totals and margins as
+#   build_annual_pnl_accrual.py / build_annual_pnl_cash.py
+# - write_csv(): the pandas to_csv layout (repr floats, True/False, empty for NaN) via the csv module
+# - CLI writes the monthly model and both annual P&Ls byte-identical to the pandas scripts;
+#   the "chains"/"fleets" layout still needs build_all.py
+
+import argparse
+import csv
+import json
+import math
+import numpy as np
+from pathlib import Path
+
+from emission import monthly_coins
+from instrument import add_cli_args, configure_from_args, stage
+from miner_catalog import HASH_PREFIX, sheet_specs
+from treasury import cash_sales, treasury_policy
+
+# ---------- Utils
+
+def _parse_hashrate(value):
+    """
+    Accepts numeric H/s or strings like:
+      "1.04 GH/s", "120 TH/s", "95PH/s", "600EH/s", "1e14", "120TH"
+    Returns raw H/s (float).
+    """
+    if value is None:
+        raise ValueError("network_hashrate missing")
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    s = str(value).strip().lower()
+    # Normalize unit tokens: remove spaces and common suffixes
+    s = s.replace(" ", "")
+    # Split numeric prefix and unit suffix
+    num_str, unit = "", ""
+    for i, ch in enumerate(s):
+        if ch not in "0123456789.+-e":
+            num_str = s[:i]
+            unit = s[i:]
+            break
+    # A trailing "e" belongs to the exa prefix, not an exponent ("600eh/s")
+    if num_str.endswith("e"):
+        num_str, unit = num_str[:-1], "e" + unit
+    if num_str == "":
+        # Might be a pure number like "1e14"
+        try:
+            return float(s)
+        except Exception as e:
+            raise ValueError(f"Unrecognized hashrate format: {value}") from e
+
+    # Strip /s and h/s variants
+    unit = unit.replace("/s", "").replace("h/s", "").replace("hs", "")
+    num = float(num_str)
+
+    if unit.startswith("gh"):
+        return num * 1e9
+    if unit.startswith("th"):
+        return num * 1e12
+    if unit.startswith("ph"):
+        return num * 1e15
+    if unit.startswith("eh"):
+        return num * 1e18
+    if unit in ("", "h"):
+        return num
+    # Handle forms like "ghs", "ths", "phs", "ehs"
+    if unit.endswith("s"):
+        core = unit[:-1]
+        if core == "gh": return num * 1e9
+        if core == "th": return num * 1e12
+        if core == "ph": return num * 1e15
+        if core == "eh": return num * 1e18
+
+    raise ValueError(f"Unknown hashrate unit: {value}")
+
+def _fleet_hashrate_hs(units: int, per_unit_hash: float, unit_kind: str) -> float:
+    """Convert per-unit hashrate (TH/s, GH/s, ...) -> H/s and scale by units."""
+    kind = (unit_kind or "").strip().upper()
+    if kind[1:2] == "H" and kind[:1] in HASH_PREFIX:
+        per_hs = float(per_unit_hash) * HASH_PREFIX[kind[:1]]
+    else:
+        per_hs = float(per_unit_hash)  # assume already H/s
+    return float(units) * per_hs
+
+def _extract_specs(csv_path: Path, model_name: str):
+    """(per-unit hashrate, unit kind, power W) for matching model_name (case-insensitive), via the miner catalog."""
+    return sheet_specs(csv_path, model_name)
+
+def _validate_chain_conf(name: str, c: dict):
+    """Required field checks & basic sanity."""
+    required = [
+        "model_name", "units", "source_csv",
+        "network_hashrate", "block_time_s", "block_reward", "base_price_usd"
+    ]
+    missing = [k for k in required if k not in c]
+    if missing:
+        raise ValueError(f"{name}: missing required fields {missing}")
+    if int(c["units"]) <= 0:
+        raise ValueError(f"{name}: units must be > 0")
+    if float(c["block_time_s"]) <= 0:
+        raise ValueError(f"{name}: block_time_s must be > 0")
+    if float(c["block_reward"]) < 0:
+        raise ValueError(f"{name}: block_reward must be >= 0")
+    if float(c["base_price_usd"]) < 0:
+        raise ValueError(f"{name}: base_price_usd must be >= 0")
+    if _parse_hashrate(c["network_hashrate"]) <= 0:
+        raise ValueError(f"{name}: network_hashrate must be > 0")
+
+def _coins_per_day(conf: dict, units: int, per_unit_hash: float, unit_kind: str) -> float:
+    """Coins/day from network share, blocks/day, reward, minus pool fee."""
+    net_hs  = _parse_hashrate(conf["network_hashrate"])   # H/s
+    my_hs   = _fleet_hashrate_hs(units, per_unit_hash, unit_kind)
+    if my_hs > net_hs:
+        # Not fatal, but likely misconfigured inputs
+        raise ValueError(
+            f"{conf.get('model_name','miner')}: fleet hashrate ({my_hs:.3e} H/s) "
+            f"> network hashrate ({net_hs:.3e} H/s). Check assumptions."
+        )
+    share   = 0.0 if net_hs <= 0 else (my_hs / net_hs)
+    blocks_per_day = 86400.0 / float(conf["block_time_s"])
+    reward  = float(conf["block_reward"])
+    fee     = float(conf.get("pool_fee_pct", 0.0))
+    return share * blocks_per_day * reward * (1.0 - fee)
+
+# ---------- Calendar & growth curves (columnar)
+
+def _month_calendar(start_month: str, end_month: str) -> dict:
+    """
+    Whole-horizon month calendar as NumPy arrays (one entry per month):
+      period ("YYYY-MM-01"), year, month, days, year_index (years since start).
+    """
+    start = np.datetime64(start_month, "M")
+    end = np.datetime64(end_month, "M")
+    if end < start:
+        raise ValueError(f"end_month {end_month} is before start_month {start_month}")
+    months = np.arange(start, end + 1)
+    first_day = months.astype("datetime64[D]")
+    year = months.astype("datetime64[Y]").astype(np.int64) + 1970
+    return {
+        "period": np.datetime_as_string(first_day, unit="D"),
+        "year": year,
+        "month": months.astype(np.int64) % 12 + 1,
+        "days": ((months + 1).astype("datetime64[D]") - first_day).astype(np.int64),
+        "year_index": year - year[0],
+    }
+
+def _growth_curve(rate: float, year_index: np.ndarray) -> np.ndarray:
+    """(1 + rate) ** year_index, computed once per calendar year and broadcast to months."""
+    n_years = int(year_index.max()) + 1 if len(year_index) else 0
+    factors = np.array([(1.0 + rate) ** k for k in range(n_years)], dtype=float)
+    return factors[year_index]
+
+def _monthly_coins(conf: dict, specs: tuple, cal: dict) -> np.ndarray:
+    """
+    Coins mined per full calendar month (before the winter mask). Static block_reward scaled by
+    annual difficulty growth, or the halving/era schedule when the chain has an "emission" block.
+    """
+    per_unit_hash, unit_kind, _ = specs
+    units = int(conf["units"])
+
+    # Baseline daily coins from network hashrate share (also validates fleet < network)
+    day0 = _coins_per_day(conf, units, per_unit_hash, unit_kind)
+    if "emission" in conf:
+        return monthly_coins(conf, _fleet_hashrate_hs(units, per_unit_hash, unit_kind),
+                             _parse_hashrate(conf["network_hashrate"]), cal)
+    coins_day = day0 / _growth_curve(float(conf.get("annual_difficulty_pct", 0.0)), cal["year_index"])
+    return coins_day * cal["days"]
+
+def _chain_arrays(conf: dict, specs: tuple, cal: dict, is_winter: np.ndarray,
+                  elec_curve: np.ndarray) -> dict:
+    """Monthly per-chain columns (unprefixed) for one fleet, computed over the whole horizon."""
+    per_unit_hash, unit_kind, power_w_each = specs
+    units = int(conf["units"])
+    year_index = cal["year_index"]
+    days = cal["days"]
+
+    price = float(conf["base_price_usd"]) * _growth_curve(float(conf.get("annual_price_pct", 0.0)), year_index)
+
+    # Power/day (kWh)
+    kwh_day = units * power_w_each * 24 / 1000.0
+
+    coins = np.where(is_winter, _monthly_coins(conf, specs, cal), 0.0)
+    kwh = np.where(is_winter, kwh_day * days, 0.0)
+    return {
+        "model": conf["model_name"],
+        "units": units,
+        "unit_hash": per_unit_hash,
+        "unit_hash_unit": unit_kind,
+        "unit_power_w": power_w_each,
+        "coins_mined": coins,
+        "revenue_accrual": coins * price,
+        "kwh": kwh,
+        "power_cost": kwh * elec_curve,
+        "price_used": price,
+    }
+
+# ---------- Monthly columns
+
+CHAIN_FIELDS = [
+    "model", "units", "unit_hash", "unit_hash_unit", "unit_power_w",
+    "coins_mined", "revenue_accrual", "kwh", "power_cost", "price_used",
+    "cash_sales",
+]
+MONEY_FIELDS = ("revenue_accrual", "power_cost", "cash_sales", "price_used")
+
+def monthly_columns(assumptions: dict, repo_root: Path, cache=None) -> dict:
+    """
+    Monthly model as {column: array or per-chain scalar}, in output column order, full precision.
+    With a build_cache.BuildCache, specs and per-chain arrays are reused when their inputs match.
+    """
+    # The single-site model only knows the top-level btc/etc blocks
+    if "fleets" in assumptions or "chains" in assumptions:
+        raise ValueError('chains/fleets assumptions need build_all.py (or build_fleet_model.py)')
+
+    # Global
+    cal = _month_calendar(assumptions["start_month"], assumptions["end_month"])
+
+    winter = list(assumptions.get("winter_months", [10,11,12,1,2,3,4]))
+    base_elec = float(assumptions.get("elec_rate_usd_per_kwh", 0.081))
+    annual_power_pct = float(assumptions.get("annual_power_pct", 0.0))
+
+    btc = assumptions["btc"]
+    etc = assumptions["etc"]
+
+    # Validate chain configs (parses network_hashrate)
+    with stage("validate"):
+        _validate_chain_conf("btc", btc)
+        _validate_chain_conf("etc", etc)
+        if "power_budget_kw" in assumptions:
+            raise ValueError('power_budget_kw needs the "chains"/"fleets" layout (build_fleet_model.py)')
+
+    is_winter = np.isin(cal["month"], winter)
+    elec_curve = base_elec * _growth_curve(annual_power_pct, cal["year_index"])
+
+    keys = None
+    if cache is not None:
+        from build_cache import stage_keys
+        keys = stage_keys(assumptions, repo_root)
+
+    def chain(name: str, conf: dict) -> dict:
+        # Miner specs (always from CSVs)
+        def specs():
+            return _extract_specs(repo_root / conf["source_csv"], conf["model_name"])
+        if keys is None:
+            with stage(f"specs:{name}"):
+                chain_specs = specs()
+            with stage(f"chain:{name}", rows=len(cal["period"])):
+                return _chain_arrays(conf, chain_specs, cal, is_winter, elec_curve)
+        with stage(f"specs:{name}"):
+            chain_specs = cache.fetch("specs", keys["specs"][name], specs)
+        with stage(f"chain:{name}", rows=len(cal["period"])):
+            return cache.fetch("chain", keys["chain"][name],
+                               lambda: _chain_arrays(conf, chain_specs, cal, is_winter, elec_curve))
+
+    chains = {"btc": chain("btc", btc), "etc": chain("etc", etc)}
+
+    # Cash sales from the treasury policy (default: fixed 12-month lag)
+    with stage("sell_lag"):
+        for name, conf in (("btc", btc), ("etc", etc)):
+            chains[name] = dict(chains[name], cash_sales=cash_sales(
+                chains[name]["coins_mined"], chains[name]["price_used"], treasury_policy(assumptions, conf)))
+
+    cols = {
+        "period": cal["period"],
+        "year": cal["year"],
+        "month": cal["month"],
+        "is_winter": is_winter,
+    }
+    for field in CHAIN_FIELDS:
+        for name, arrays in chains.items():
+            cols[f"{name}_{field}"] = arrays.get(field, 0.0)
+    return cols
+
+def _is_money(column: str) -> bool:
+    return any(column == f or column.endswith("_" + f) for f in MONEY_FIELDS)
+
+def round_columns(cols: dict) -> dict:
+    """round_monthly() for a column dict: money fields to 2 decimals, other floats to 6."""
+    out = {}
+    for c, v in cols.items():
+        is_float = isinstance(v, float) or (isinstance(v, np.ndarray) and v.dtype.kind == "f")
+        out[c] = np.round(v, 2 if _is_money(c) else 6) if is_float else v
+    return out
+
+# ---------- Annual roll-ups
+
+def annual_pnl(cols: dict, chains=("btc", "etc"), basis: str = "accrual") -> dict:
+    """
+    Annual P&L columns from monthly columns: per-year sums, then the same rounding, totals,
+    profits and margins as the accrual / cash P&L scripts.
+    """
+    if basis not in ("accrual", "cash"):
+        raise ValueError("basis must be 'accrual' or 'cash'")
+    base, total = ("revenue_accrual", "total_revenue") if basis == "accrual" else ("cash_sales", "total_sales")
+    year = np.asarray(cols["year"])
+    years = np.unique(year)
+    masks = [year == y for y in years]
+
+    def yearly(c):
+        v = np.broadcast_to(np.asarray(cols[c], dtype=float), year.shape)
+        v = np.where(np.isnan(v), 0.0, v)
+        return np.round(np.array([math.fsum(v[m]) for m in masks]), 2)
+
+    out = {"year": years}
+    sales = {c: yearly(f"{c}_{base}") for c in chains}
+    power = {c: yearly(f"{c}_power_cost") for c in chains}
+    profit = {c: np.round(sales[c] - power[c], 2) for c in chains}
+    total_sales = np.round(sum(sales.values(), 0.0), 2)
+    total_power = np.round(sum(power.values(), 0.0), 2)
+    profit_total = np.round(total_sales - total_power, 2)
+
+    def margin(numer, denom):
+        # If revenue < $1, treat margin as 0% to avoid crazy % from near-zero
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.round(np.where(denom >= 1.0, 100.0 * numer / denom, 0.0), 2)
+
+    out.update({f"{c}_{base}": sales[c] for c in chains})
+    out[total] = total_sales
+    out.update({f"{c}_power_cost": power[c] for c in chains})
+    out["total_power_cost"] = total_power
+    out.update({f"{c}_operating_profit": profit[c] for c in chains})
+    out["operating_profit_total"] = profit_total
+    out.update({f"{c}_margin_pct": margin(profit[c], sales[c]) for c in chains})
+    out["margin_pct_total"] = margin(profit_total, total_sales)
+    return out
+
+# ---------- CSV output
+
+def _cell(v):
+    if isinstance(v, float) and math.isnan(v):
+        return ""
+    return v
+
+def write_csv(cols: dict, path: Path) -> Path:
+    """Write a column dict in DataFrame.to_csv(index=False) layout; scalars repeat down the column."""
+    n = max((len(v) for v in cols.values() if isinstance(v, np.ndarray) and v.ndim), default=1)
+    columns = [np.broadcast_to(v, (n,)).tolist() if isinstance(v, np.ndarray) else [v] * n
+               for v in cols.values()]
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", newline="") as f:
+        w = csv.writer(f, lineterminator="\n")
+        w.writerow(cols.keys())
+        w.writerows([_cell(v) for v in row] for row in zip(*columns))
+    return path
+
+# ---------- CLI
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Monthly model + annual P&Ls without pandas")
+    ap.add_argument("--out-dir", default="data")
+    add_cli_args(ap)
+    args = ap.parse_args()
+    configure_from_args(args)
+
+    repo_root = Path(".")
+    conf_path = repo_root / "config" / "assumptions.json"
+    if not conf_path.exists():
+        raise SystemExit(f"Missing assumptions file: {conf_path}")
+    with stage("read_assumptions"):
+        assumptions = json.loads(conf_path.read_text())
+    if "fleets" in assumptions or "chains" in assumptions:
+        raise SystemExit("chains/fleets assumptions need build_all.py")
+
+    with stage("monthly"):
+        monthly = round_columns(monthly_columns(assumptions, repo_root))
+    with stage("annual"):
+        accrual = annual_pnl(monthly, basis="accrual")
+        cash = annual_pnl(monthly, basis="cash")
+    out_dir = repo_root / args.out_dir
+    for cols, name in ((monthly, "monthly_model_2025_2030.csv"), (accrual, "annual_pnl_accrual.csv"),
+                       (cash, "annual_pnl_cash.csv")):
+        with stage(f"write:{name}"):
+            out = write_csv(cols, out_dir / name)
+        print(f"Wrote {out}")
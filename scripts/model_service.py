@@ -0,0 +1,246 @@
+# scripts/model_service.py
+# Long-running local model service for interactive what-if queries
+# - Keeps the interpreter, pandas, the parsed miner catalog and config/assumptions.json warm
+# - POST /model with {"overrides": {...}, "include": ["monthly", "accrual", "cash"]}: overrides of
+#   assumptions.json keys (nested blocks or dotted keys, as in run_scenarios.py); returns the
+#   rounded monthly model and the annual accrual / cash P&Ls as JSON records
+# - Two cache levels:
+#     results  LRU keyed on the normalized override set (flattened to dotted keys, sorted, no-op
+#              overrides dropped), so a repeated query is one dict lookup + the stored JSON bytes
+#     stages   build_cache.MemoryCache under run_pipeline: overlapping queries (e.g. same BTC
+#              price, different power rate) reuse specs and per-chain arrays they share
+# - GET /health, GET /stats (query count, result hits, stage cache summary); POST /reload re-reads
+#   the base assumptions file and clears both caches
+# - Binds 127.0.0.1 only. ModelClient / the "query" subcommand talk to it with urllib
+#
+#   python scripts/model_service.py serve --port 8765
+#   python scripts/model_service.py query '{"btc.base_price_usd": 90000, "elec_rate_usd_per_kwh": 0.11}'
+
+import argparse
+import copy
+import json
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from build_all import run_pipeline
+from build_cache import MemoryCache
+from build_monthly_model import round_monthly
+from run_scenarios import _apply_overrides
+
+PARTS = ("monthly", "accrual", "cash")
+DEFAULT_PORT = 8765
+
+# ---------- Override normalization
+
+def _flatten(d: dict, prefix: str = "") -> dict:
+    out = {}
+    for k, v in d.items():
+        key = f"{prefix}{k}"
+        if isinstance(v, dict) and v:
+            out.update(_flatten(v, key + "."))
+        else:
+            out[key] = v
+    return out
+
+def _canonical(v):
+    # 90000 and 90000.0 are the same override
+    if isinstance(v, bool) or not isinstance(v, (int, float)):
+        return v
+    return float(v)
+
+def normalize_overrides(base: dict, overrides: dict) -> str:
+    """Canonical key for an override set: dotted keys, sorted, values equal to the base dropped."""
+    effective = _flatten(base)
+    flat = {}
+    for k, v in _flatten(overrides).items():
+        v = _canonical(v)
+        if k in effective and _canonical(effective[k]) == v:
+            continue
+        flat[k] = v
+    return json.dumps(flat, sort_keys=True, separators=(",", ":"), default=str)
+
+# ---------- Model
+
+class ModelService:
+    """Warm model state: base assumptions, stage cache and the result LRU."""
+
+    def __init__(self, repo_root: Path, conf_path: Path, max_results: int = 512, max_stages: int = 256):
+        self.repo_root = Path(repo_root)
+        self.conf_path = Path(conf_path)
+        self.max_results = max_results
+        self.max_stages = max_stages
+        self.lock = threading.Lock()
+        self.queries = 0
+        self.result_hits = 0
+        self.reload()
+
+    def reload(self):
+        with self.lock:
+            self.base = json.loads(self.conf_path.read_text())
+            self.stages = MemoryCache(self.max_stages)
+            self.results = OrderedDict()
+
+    def query(self, overrides: dict, include=PARTS) -> bytes:
+        """JSON bytes for one what-if query (served from the result LRU when seen before)."""
+        include = tuple(p for p in PARTS if p in include)
+        key = (normalize_overrides(self.base, overrides), include)
+        with self.lock:
+            self.queries += 1
+            body = self.results.get(key)
+            if body is not None:
+                self.results.move_to_end(key)
+                self.result_hits += 1
+                return body
+
+            t0 = time.perf_counter()
+            assumptions = _apply_overrides(self.base, copy.deepcopy(overrides))
+            monthly, accrual, cash = run_pipeline(assumptions, self.repo_root, cache=self.stages)
+            frames = {"monthly": round_monthly(monthly.copy()), "accrual": accrual, "cash": cash}
+            payload = {
+                "overrides": json.loads(key[0]),
+                **{p: json.loads(frames[p].to_json(orient="records")) for p in include},
+                "compute_ms": round(1000 * (time.perf_counter() - t0), 3),
+            }
+            body = json.dumps(payload).encode()
+            self.results[key] = body
+            if len(self.results) > self.max_results:
+                self.results.popitem(last=False)
+            return body
+
+    def stats(self) -> dict:
+        return {
+            "queries": self.queries,
+            "result_hits": self.result_hits,
+            "results_cached": len(self.results),
+            "stages": self.stages.summary(),
+        }
+
+# ---------- HTTP
+
+def _handler(service: ModelService):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body: bytes):
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _error(self, status: int, message: str):
+            self._send(status, json.dumps({"error": message}).encode())
+
+        def log_message(self, fmt, *args):
+            pass  # quiet; /stats has the counters
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send(200, b'{"status":"ok"}')
+            elif self.path == "/stats":
+                self._send(200, json.dumps(service.stats()).encode())
+            else:
+                self._error(404, f"unknown path {self.path}")
+
+        def do_POST(self):
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                request = json.loads(self.rfile.read(length) or b"{}")
+            except (ValueError, json.JSONDecodeError) as e:
+                return self._error(400, f"bad JSON: {e}")
+            if self.path not in ("/reload", "/model"):
+                return self._error(404, f"unknown path {self.path}")
+            if not isinstance(request, dict):
+                return self._error(400, "request body must be a JSON object")
+            try:
+                if self.path == "/reload":
+                    service.reload()
+                    return self._send(200, b'{"status":"reloaded"}')
+                overrides = request.get("overrides", {})
+                include = request.get("include", list(PARTS))
+                if not isinstance(overrides, dict) or not isinstance(include, list):
+                    return self._error(400, "overrides must be an object and include a list")
+                self._send(200, service.query(overrides, include))
+            except (ValueError, KeyError, TypeError, FileNotFoundError, SystemExit) as e:
+                self._error(400, str(e))
+            except Exception as e:
+                # Always answer with JSON; the service keeps running
+                self._error(500, f"{type(e).__name__}: {e}")
+    return Handler
+
+def serve(service: ModelService, port: int = DEFAULT_PORT, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Bound server (call serve_forever(), or run it in a thread for tests)."""
+    return ThreadingHTTPServer((host, port), _handler(service))
+
+# ---------- Client
+
+class ModelClient:
+    """Minimal local client for the service."""
+
+    def __init__(self, url: str = f"http://127.0.0.1:{DEFAULT_PORT}", timeout: float = 60.0):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, path: str, payload: dict = None) -> dict:
+        data = None if payload is None else json.dumps(payload).encode()
+        req = urllib.request.Request(self.url + path, data=data, headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                return json.loads(resp.read())
+        except urllib.error.HTTPError as e:
+            raise ValueError(json.loads(e.read()).get("error", str(e))) from None
+
+    def query(self, overrides: dict = None, include=PARTS) -> dict:
+        return self._request("/model", {"overrides": overrides or {}, "include": list(include)})
+
+    def stats(self) -> dict:
+        return self._request("/stats")
+
+    def health(self) -> dict:
+        return self._request("/health")
+
+    def reload(self) -> dict:
+        return self._request("/reload", {})
+
+# ---------- CLI
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Local what-if model service (and client)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    s = sub.add_parser("serve", help="run the service on 127.0.0.1")
+    s.add_argument("--port", type=int, default=DEFAULT_PORT)
+    s.add_argument("--assumptions", default="config/assumptions.json")
+    s.add_argument("--max-results", type=int, default=512, help="result LRU size")
+    q = sub.add_parser("query", help="send one query to a running service")
+    q.add_argument("overrides", nargs="?", default="{}", help="JSON object of assumptions overrides")
+    q.add_argument("--include", default="accrual,cash", help="comma-separated: monthly,accrual,cash")
+    q.add_argument("--url", default=f"http://127.0.0.1:{DEFAULT_PORT}")
+    args = ap.parse_args()
+
+    if args.cmd == "serve":
+        repo_root = Path(".")
+        conf_path = repo_root / args.assumptions
+        if not conf_path.exists():
+            raise SystemExit(f"Missing assumptions file: {conf_path}")
+        service = ModelService(repo_root, conf_path, max_results=args.max_results)
+        service.query({})  # warm the catalog, pandas paths and the base case
+        server = serve(service, args.port)
+        print(f"Serving on http://127.0.0.1:{args.port} (POST /model, GET /stats)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.server_close()
+    else:
+        try:
+            overrides = json.loads(args.overrides)
+            result = ModelClient(args.url).query(overrides, [p for p in args.include.split(",") if p])
+        except (ValueError, json.JSONDecodeError) as e:
+            raise SystemExit(f"Query failed: {e}")
+        except urllib.error.URLError as e:
+            raise SystemExit(f"Service not reachable at {args.url}: {e.reason}")
+        json.dump(result, sys.stdout, indent=2)
+        print()
@@ -0,0 +1,254 @@
+# scripts/monte_carlo.py
+# Monte Carlo bands for the monthly model (btc / etc)
+# - Price paths: GBM shocks around the deterministic annual_price_pct curve
+# - Difficulty paths: lognormal shocks around the annual_difficulty_pct curve, normalized so
+#   expected coins/day follow the deterministic curve
+# - Block luck: Poisson network block counts per month (pool payouts scale with blocks found)
+# - Cash basis sells coin lots by the treasury policy at the path's price in the sale month
+# - Paths are simulated in fixed-size chunks seeded from one SeedSequence, so results do not
+#   depend on the worker count; chunks can fan out to a process pool
+# - Each chunk is folded into fixed-bin histograms (streamed aggregation): the full
+#   (paths x months) matrix is never held in memory
+# - Writes data/mc_monthly_revenue_bands.csv and data/mc_annual_pnl_bands.csv
+
+import argparse
+import json
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from instrument import add_cli_args, configure_from_args, stage
+from mining_core import (
+    _extract_specs, _growth_curve, _month_calendar, _monthly_coins, _validate_chain_conf,
+)
+from treasury import cash_sales, treasury_policy
+
+CHAINS = ("btc", "etc")
+DEFAULT_VOL = {
+    "btc": {"price_vol_annual": 0.55, "difficulty_vol_annual": 0.15},
+    "etc": {"price_vol_annual": 0.80, "difficulty_vol_annual": 0.25},
+}
+PERCENTILES = (5, 50, 95)
+
+# ---------- Model context (deterministic curves shared by every path)
+
+def _mc_context(assumptions: dict, repo_root: Path) -> dict:
+    """Deterministic monthly curves + volatility knobs; small and picklable for worker init."""
+    cal = _month_calendar(assumptions["start_month"], assumptions["end_month"])
+    winter = list(assumptions.get("winter_months", [10,11,12,1,2,3,4]))
+    is_winter = np.isin(cal["month"], winter)
+    elec = float(assumptions.get("elec_rate_usd_per_kwh", 0.081)) * _growth_curve(
+        float(assumptions.get("annual_power_pct", 0.0)), cal["year_index"])
+    mc_conf = assumptions.get("monte_carlo", {})
+
+    chains = {}
+    for name in CHAINS:
+        conf = assumptions[name]
+        _validate_chain_conf(name, conf)
+        per_unit_hash, unit_kind, power_w_each = _extract_specs(repo_root / conf["source_csv"], conf["model_name"])
+        units = int(conf["units"])
+        vol = {**DEFAULT_VOL[name], **mc_conf.get(name, {})}
+        coins = _monthly_coins(conf, (per_unit_hash, unit_kind, power_w_each), cal)
+        kwh = np.where(is_winter, units * power_w_each * 24 / 1000.0 * cal["days"], 0.0)
+        chains[name] = {
+            "price": float(conf["base_price_usd"]) * _growth_curve(
+                float(conf.get("annual_price_pct", 0.0)), cal["year_index"]),
+            "coins": np.where(is_winter, coins, 0.0),
+            "power_cost": kwh * elec,
+            "blocks": cal["days"] * 86400.0 / float(conf["block_time_s"]),
+            "price_vol": float(vol["price_vol_annual"]),
+            "difficulty_vol": float(vol["difficulty_vol_annual"]),
+        }
+
+    years, year_pos = np.unique(cal["year"], return_inverse=True)
+    to_year = np.zeros((len(cal["year"]), len(years)))
+    to_year[np.arange(len(year_pos)), year_pos] = 1.0
+    return {
+        "cal": cal,
+        "years": years,
+        "to_year": to_year,
+        "treasury": {name: treasury_policy(assumptions, assumptions[name]) for name in CHAINS},
+        "chains": chains,
+    }
+
+def _output_columns(ctx: dict) -> list:
+    """(kind, chain, label) for every column of the per-path value matrix."""
+    cols = []
+    for name in CHAINS:
+        cols += [("monthly_revenue", name, p) for p in ctx["cal"]["period"]]
+    for basis in ("accrual", "cash"):
+        for name in CHAINS + ("total",):
+            cols += [(basis, name, int(y)) for y in ctx["years"]]
+    return cols
+
+# ---------- Path simulation
+
+def _log_shocks(rng, n: int, months: int, vol_annual: float) -> np.ndarray:
+    """Cumulative martingale log shocks (first month unshocked): E[exp(shock)] == 1."""
+    out = np.zeros((n, months))
+    if vol_annual > 0 and months > 1:
+        step = vol_annual * np.sqrt(1.0 / 12.0)
+        out[:, 1:] = np.cumsum(step * rng.standard_normal((n, months - 1)) - 0.5 * step * step, axis=1)
+    return out
+
+def _simulate_chunk(ctx: dict, seed, n: int) -> np.ndarray:
+    """(n, columns) matrix of monthly revenue and annual accrual/cash operating profit."""
+    rng = np.random.default_rng(seed)
+    months = len(ctx["cal"]["period"])
+    to_year = ctx["to_year"]
+
+    revenue, accrual, cash = [], [], []
+    for name in CHAINS:
+        c = ctx["chains"][name]
+        price = c["price"] * np.exp(_log_shocks(rng, n, months, c["price_vol"]))
+        # Share of network hashrate moves inversely with difficulty
+        share = np.exp(_log_shocks(rng, n, months, c["difficulty_vol"]))
+        luck = rng.poisson(c["blocks"], size=(n, months)) / c["blocks"]
+        coins = c["coins"] * luck * share
+        rev = coins * price
+        power_y = c["power_cost"] @ to_year
+        revenue.append(rev)
+        accrual.append(rev @ to_year - power_y)
+        # Lots are sold at the simulated price of the sale month, not the month mined
+        cash.append(cash_sales(coins, price, ctx["treasury"][name]) @ to_year - power_y)
+
+    accrual.append(sum(accrual))
+    cash.append(sum(cash))
+    return np.hstack(revenue + accrual + cash)
+
+# ---------- Streamed aggregation
+
+class _HistogramSketch:
+    """Per-column fixed-bin histogram with under/overflow bins, exact min/max/mean; mergeable."""
+
+    def __init__(self, lo: np.ndarray, hi: np.ndarray, bins: int):
+        self.lo = lo
+        self.width = np.where(hi > lo, (hi - lo) / bins, 1.0)
+        self.bins = bins
+        n_cols = len(lo)
+        self.counts = np.zeros((n_cols, bins + 2), dtype=np.int64)
+        self.total = np.zeros(n_cols)
+        self.vmin = np.full(n_cols, np.inf)
+        self.vmax = np.full(n_cols, -np.inf)
+        self.n = 0
+
+    def add(self, values: np.ndarray):
+        n, n_cols = values.shape
+        pos = np.floor((values - self.lo) / self.width).astype(np.int64)
+        pos = np.clip(pos, -1, self.bins) + 1
+        flat = pos + np.arange(n_cols) * (self.bins + 2)
+        self.counts += np.bincount(flat.ravel(), minlength=self.counts.size).reshape(self.counts.shape)
+        self.total += values.sum(axis=0)
+        self.vmin = np.minimum(self.vmin, values.min(axis=0))
+        self.vmax = np.maximum(self.vmax, values.max(axis=0))
+        self.n += n
+
+    def merge(self, other: "_HistogramSketch"):
+        self.counts += other.counts
+        self.total += other.total
+        self.vmin = np.minimum(self.vmin, other.vmin)
+        self.vmax = np.maximum(self.vmax, other.vmax)
+        self.n += other.n
+
+    def quantile(self, q: float) -> np.ndarray:
+        """Linear interpolation inside the bin holding the q-th value (clamped to observed min/max)."""
+        target = q * self.n
+        cum = np.cumsum(self.counts, axis=1)
+        idx = np.argmax(cum >= target, axis=1)
+        before = np.take_along_axis(cum, idx[:, None], axis=1)[:, 0] - self.counts[np.arange(len(idx)), idx]
+        inside = self.counts[np.arange(len(idx)), idx]
+        frac = np.where(inside > 0, (target - before) / np.maximum(inside, 1), 0.0)
+        edge = self.lo + (idx - 1 + frac) * self.width
+        return np.clip(edge, self.vmin, self.vmax)
+
+    def mean(self) -> np.ndarray:
+        return self.total / max(self.n, 1)
+
+def _pilot_edges(values: np.ndarray, pad: float = 0.5) -> tuple:
+    """Histogram range from the pilot chunk, padded so later chunks rarely overflow."""
+    lo, hi = values.min(axis=0), values.max(axis=0)
+    span = np.maximum(hi - lo, 1e-9 * np.maximum(np.abs(hi), 1.0))
+    return lo - pad * span, hi + pad * span
+
+_CTX = None
+
+def _init_worker(ctx: dict):
+    global _CTX
+    _CTX = ctx
+
+def _sketch_chunk(seed, n: int, lo: np.ndarray, hi: np.ndarray, bins: int) -> _HistogramSketch:
+    sketch = _HistogramSketch(lo, hi, bins)
+    sketch.add(_simulate_chunk(_CTX, seed, n))
+    return sketch
+
+# ---------- Driver
+
+def run_monte_carlo(assumptions: dict, repo_root: Path, paths: int = 100000, chunk_size: int = 10000,
+                    seed: int = 0, workers: int = 0, bins: int = 4096,
+                    percentiles=PERCENTILES) -> tuple:
+    """Simulate `paths` paths; return (monthly revenue bands, annual P&L bands) DataFrames."""
+    if paths <= 0 or chunk_size <= 0:
+        raise ValueError("paths and chunk_size must be > 0")
+    ctx = _mc_context(assumptions, repo_root)
+    columns = _output_columns(ctx)
+
+    sizes = [min(chunk_size, paths - lo) for lo in range(0, paths, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    # Pilot chunk fixes the histogram edges for every later chunk
+    pilot = _simulate_chunk(ctx, seeds[0], sizes[0])
+    lo, hi = _pilot_edges(pilot)
+    sketch = _HistogramSketch(lo, hi, bins)
+    sketch.add(pilot)
+    del pilot
+
+    rest = list(zip(seeds[1:], sizes[1:]))
+    if workers and workers > 1 and rest:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(ctx,)) as pool:
+            futures = [pool.submit(_sketch_chunk, s, n, lo, hi, bins) for s, n in rest]
+            for f in as_completed(futures):
+                sketch.merge(f.result())
+    else:
+        _init_worker(ctx)
+        for s, n in rest:
+            sketch.merge(_sketch_chunk(s, n, lo, hi, bins))
+
+    stats = {f"p{p}": sketch.quantile(p / 100.0) for p in percentiles}
+    stats["mean"] = sketch.mean()
+    bands = pd.DataFrame(columns, columns=["kind", "chain", "label"])
+    for k, v in stats.items():
+        bands[k] = np.round(v, 2)
+
+    monthly = bands[bands["kind"] == "monthly_revenue"].drop(columns="kind").rename(columns={"label": "period"})
+    annual = bands[bands["kind"] != "monthly_revenue"].rename(columns={"kind": "basis", "label": "year"})
+    annual["year"] = annual["year"].astype(int)
+    return monthly.reset_index(drop=True), annual.reset_index(drop=True)
+
+# ---------- CLI
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Monte Carlo bands for monthly revenue and annual P&L")
+    ap.add_argument("--paths", type=int, default=100000)
+    ap.add_argument("--chunk-size", type=int, default=10000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--workers", type=int, default=0, help="process pool size (0 = in-process)")
+    ap.add_argument("--bins", type=int, default=4096)
+    add_cli_args(ap)
+    args = ap.parse_args()
+    configure_from_args(args)
+
+    repo_root = Path(".")
+    conf_path = repo_root / "config" / "assumptions.json"
+    if not conf_path.exists():
+        raise SystemExit(f"Missing assumptions file: {conf_path}")
+    with stage("read_assumptions"):
+        assumptions = json.loads(conf_path.read_text())
+    with stage("monte_carlo", paths=args.paths):
+        monthly, annual = run_monte_carlo(assumptions, repo_root, paths=args.paths, chunk_size=args.chunk_size,
+                                          seed=args.seed, workers=args.workers, bins=args.bins)
+    for df, name in ((monthly, "mc_monthly_revenue_bands.csv"), (annual, "mc_annual_pnl_bands.csv")):
+        out = repo_root / "data" / name
+        with stage("write", rows=len(df)):
+            df.to_csv(out, index=False)
+        print(f"Wrote {out}")
@@ -0,0 +1,221 @@
+# scripts/optimize_fleet.py
+# Fleet optimizer: best miner mix from the BTC + ETC sheets under capital and power budgets
+# - Per-unit economics for every catalog SKU at once: coins per month for 1 H/s from _monthly_coins
+#   (emission schedules apply), monthly price/power curves from the monthly model (winter-only mining)
+# - Objectives: "npv" (discounted monthly operating profit - unit price) or
+#   "winter_profit" (undiscounted operating profit over the horizon's winter months)
+# - Constraints: capital budget (USD), circuit limit (kW), per-model unit cap
+# - Fleet value is linear in unit counts, so candidates are scored in bulk:
+#   dominated SKUs are dropped, then the integer grid is enumerated in bulk when it is small
+#   and searched by branch-and-bound (LP bounds) otherwise
+# - Writes reports/fleet_plan.csv
+
+import argparse
+import json
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from instrument import add_cli_args, configure_from_args, stage
+from mining_core import _growth_curve, _month_calendar, _monthly_coins, _validate_chain_conf
+from miner_catalog import MinerCatalog
+
+OBJECTIVES = ("npv", "winter_profit")
+
+# ---------- Per-unit economics
+
+def unit_values(assumptions: dict, catalog: MinerCatalog, objective: str = "npv",
+                discount_rate: float = 0.10) -> np.ndarray:
+    """Objective value of one unit of every catalog row (NaN for rows without usable specs)."""
+    if objective not in OBJECTIVES:
+        raise ValueError(f"objective must be one of {OBJECTIVES}")
+    cal = _month_calendar(assumptions["start_month"], assumptions["end_month"])
+    winter = list(assumptions.get("winter_months", [10,11,12,1,2,3,4]))
+    is_winter = np.isin(cal["month"], winter)
+    winter_days = np.where(is_winter, cal["days"], 0).astype(float)
+    elec = float(assumptions.get("elec_rate_usd_per_kwh", 0.081)) * _growth_curve(
+        float(assumptions.get("annual_power_pct", 0.0)), cal["year_index"])
+    months = np.arange(1, len(cal["period"]) + 1)
+    discount = (1.0 + discount_rate) ** (-months / 12.0) if objective == "npv" else np.ones(len(months))
+
+    cols = catalog.columns
+    values = np.full(len(catalog), np.nan)
+    for chain in catalog.tables:
+        conf = assumptions[chain]
+        _validate_chain_conf(chain, conf)
+        rows = catalog.rows(chain)
+        price = float(conf["base_price_usd"]) * _growth_curve(float(conf.get("annual_price_pct", 0.0)), cal["year_index"])
+        # Same economics as the monthly model: coins per month for 1 H/s, scaled by each SKU's hashrate
+        coins_per_hs = _monthly_coins(dict(conf, units=1), (1.0, "H/s", 0.0), cal)
+        usd_per_hs = np.where(is_winter, coins_per_hs, 0.0) * price
+        usd_per_w = 24 / 1000.0 * winter_days * elec
+        monthly = cols["hashrate_hs"][rows, None] * usd_per_hs - cols["power_w"][rows, None] * usd_per_w
+        values[rows] = monthly @ discount
+    if objective == "npv":
+        values = values - cols["price_usd"]
+    return values
+
+# ---------- Integer search
+
+def _enumerate(value, cost, power, cap, budget, max_w, chunk: int = 200000):
+    """Score every unit-count vector in the (cap + 1) grid; best feasible (value, counts)."""
+    shape = tuple(int(u) + 1 for u in cap)
+    total = int(np.prod(shape))
+    best_val, best_counts = 0.0, np.zeros(len(cap), dtype=np.int64)
+    for lo in range(0, total, chunk):
+        counts = np.stack(np.unravel_index(np.arange(lo, min(lo + chunk, total)), shape))
+        ok = (cost @ counts <= budget + 1e-9) & (power @ counts <= max_w + 1e-9)
+        if not ok.any():
+            continue
+        val = np.where(ok, value @ counts, -np.inf)
+        j = int(np.argmax(val))
+        if val[j] > best_val + 1e-9:
+            best_val, best_counts = float(val[j]), counts[:, j].copy()
+    return best_val, best_counts, True
+
+def _fractional_bound(v, w, u, order, start, cap_left):
+    """LP (fractional knapsack) bound for items >= start on one resource; `order` sorts by v/w desc."""
+    keep = order[order >= start]
+    if len(keep) == 0 or cap_left <= 0:
+        return 0.0
+    weight = w[keep] * u[keep]
+    filled = np.cumsum(weight)
+    j = int(np.searchsorted(filled, cap_left, side="right"))
+    full = float((v[keep] * u[keep])[:j].sum())
+    if j < len(keep):
+        used = filled[j - 1] if j > 0 else 0.0
+        full += (cap_left - used) * v[keep[j]] / w[keep[j]]
+    return full
+
+def _undominated(value, cost, power, cap, n_max: int, chunk: int = 2048) -> np.ndarray:
+    """
+    Mask of SKUs not dominated by another SKU with at least as much value for no more cost and
+    power. Exact when the dominating SKU's cap can absorb every unit the budgets allow (n_max).
+    """
+    n = len(value)
+    keep = np.ones(n, dtype=bool)
+    can_absorb = cap >= n_max
+    idx = np.arange(n)
+    for lo in range(0, n, chunk):
+        j = idx[lo:lo + chunk, None]
+        ge = (value[None, :] >= value[j]) & (cost[None, :] <= cost[j]) & (power[None, :] <= power[j])
+        strict = (value[None, :] > value[j]) | (cost[None, :] < cost[j]) | (power[None, :] < power[j])
+        # identical SKUs: keep the first one only
+        dom = ge & (strict | (idx[None, :] < j)) & can_absorb[None, :] & (idx[None, :] != j)
+        keep[lo:lo + chunk] = ~dom.any(axis=1)
+    return keep
+
+def _branch_and_bound(value, cost, power, cap, budget, max_w, node_limit: int = 200_000):
+    """Depth-first B&B over SKUs (highest combined value density first), LP bounds per resource."""
+    density = value / (cost / budget + power / max_w)
+    order = np.argsort(-density)
+    v, c, p, u = value[order], cost[order], power[order], cap[order].astype(np.int64)
+    n = len(v)
+    by_c = np.argsort(-(v / c))
+    by_p = np.argsort(-(v / p))
+
+    best = {"val": 0.0, "counts": np.zeros(n, dtype=np.int64)}
+    counts = np.zeros(n, dtype=np.int64)
+    nodes = [0]
+
+    def dfs(i, val, rem_c, rem_p):
+        nodes[0] += 1
+        if val > best["val"] + 1e-9:
+            best["val"], best["counts"] = val, counts.copy()
+        if i == n or nodes[0] > node_limit:
+            return
+        bound = val + min(_fractional_bound(v, c, u, by_c, i, rem_c),
+                          _fractional_bound(v, p, u, by_p, i, rem_p))
+        if bound <= best["val"] + 1e-9:
+            return
+        kmax = int(min(u[i], np.floor(rem_c / c[i] + 1e-9), np.floor(rem_p / p[i] + 1e-9)))
+        for k in range(kmax, -1, -1):
+            counts[i] = k
+            dfs(i + 1, val + k * v[i], rem_c - k * c[i], rem_p - k * p[i])
+        counts[i] = 0
+
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), n + 100))
+    dfs(0, 0.0, float(budget), float(max_w))
+    out = np.zeros(n, dtype=np.int64)
+    out[order] = best["counts"]
+    return best["val"], out, nodes[0] <= node_limit
+
+def optimize_fleet(assumptions: dict, repo_root: Path, budget_usd: float, max_kw: float,
+                   max_units_per_model: int = 20, objective: str = "npv", discount_rate: float = 0.10,
+                   chains=("btc", "etc"), catalog: MinerCatalog = None, max_grid: int = 2_000_000) -> pd.DataFrame:
+    """Best unit mix; one row per chosen SKU (units > 0)."""
+    if budget_usd <= 0 or max_kw <= 0:
+        raise ValueError("budget_usd and max_kw must be > 0")
+    if catalog is None:
+        catalog = MinerCatalog.from_assumptions(assumptions, repo_root, chains=chains)
+    cols = catalog.columns
+    values = unit_values(assumptions, catalog, objective, discount_rate)
+    max_w = float(max_kw) * 1000.0
+
+    # Only SKUs that can be bought, draw power and add value are worth searching
+    usable = (np.isfinite(values) & (values > 0) & (cols["price_usd"] > 0)
+              & (cols["power_w"] > 0) & (cols["price_usd"] <= budget_usd) & (cols["power_w"] <= max_w))
+    cand = np.flatnonzero(usable)
+    value, cost, power = values[cand], cols["price_usd"][cand], cols["power_w"][cand]
+    cap = np.minimum(max_units_per_model, np.minimum(budget_usd // cost, max_w // power)).astype(np.int64)
+    if len(cand):
+        n_max = int(min(budget_usd // cost.min(), max_w // power.min()))
+        keep = _undominated(value, cost, power, cap, n_max)
+        cand, value, cost, power, cap = cand[keep], value[keep], cost[keep], power[keep], cap[keep]
+
+    if len(cand) == 0:
+        best_val, counts, proven = 0.0, np.zeros(0, dtype=np.int64), True
+    elif np.log(cap + 1.0).sum() <= np.log(max_grid):
+        best_val, counts, proven = _enumerate(value, cost, power, cap, budget_usd, max_w)
+    else:
+        best_val, counts, proven = _branch_and_bound(value, cost, power, cap, budget_usd, max_w)
+
+    pick = counts > 0
+    rows = cand[pick]
+    n = counts[pick]
+    plan = pd.DataFrame({
+        "chain": cols["chain"][rows],
+        "model": cols["model"][rows],
+        "units": n,
+        "unit_price_usd": cols["price_usd"][rows],
+        "capex_usd": np.round(cols["price_usd"][rows] * n, 2),
+        "power_kw": np.round(cols["power_w"][rows] * n / 1000.0, 3),
+        f"{objective}_per_unit": np.round(value[pick], 2),
+        f"{objective}_usd": np.round(value[pick] * n, 2),
+    })
+    plan.attrs.update({"objective": objective, "value": round(float(best_val), 2), "proven_optimal": proven})
+    return plan
+
+# ---------- CLI
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Best miner mix under capital and power budgets")
+    ap.add_argument("--budget", type=float, default=17000.0, help="capital budget, USD")
+    ap.add_argument("--max-kw", type=float, default=30.0, help="circuit limit, kW")
+    ap.add_argument("--max-units", type=int, default=20, help="per-model unit cap")
+    ap.add_argument("--objective", choices=OBJECTIVES, default="npv")
+    ap.add_argument("--discount-rate", type=float, default=0.10, help="annual, for npv")
+    ap.add_argument("--chains", default="btc,etc")
+    add_cli_args(ap)
+    args = ap.parse_args()
+    configure_from_args(args)
+
+    repo_root = Path(".")
+    conf_path = repo_root / "config" / "assumptions.json"
+    if not conf_path.exists():
+        raise SystemExit(f"Missing assumptions file: {conf_path}")
+    with stage("read_assumptions"):
+        assumptions = json.loads(conf_path.read_text())
+    with stage("optimize") as rec:
+        plan = optimize_fleet(assumptions, repo_root, args.budget, args.max_kw, args.max_units,
+                              args.objective, args.discount_rate, chains=tuple(args.chains.split(",")))
+        rec["rows"] = len(plan)
+    print(plan.to_string(index=False))
+    print(f"{plan.attrs['objective']}: {plan.attrs['value']:.2f} USD"
+          + ("" if plan.attrs["proven_optimal"] else " (node limit hit; best found)"))
+    out = repo_root / "reports" / "fleet_plan.csv"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with stage("write", rows=len(plan)):
+        plan.to_csv(out, index=False)
+    print(f"Wrote {out}")
@@ -0,0 +1,130 @@
+# scripts/output_writer.py
+# Pluggable table writer/reader: CSV (default), Parquet, Arrow IPC
+# - Format picked by file suffix (.csv / .parquet / .arrow) or explicitly
+# - Columnar formats get compact dtypes: categorical *_model / *_unit_hash_unit / chain,
+#   bool is_winter, int32 year / month / *_units
+# - Scenario-partitioned layout: <root>/scenario=<id>/part.<ext> (hive style), read back with
+#   column projection + scenario filtering, memory-mapped where the format allows
+# - pyarrow is only needed (and only imported) for Parquet/Arrow
+
+import re
+import pandas as pd
+from pathlib import Path
+
+FORMATS = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}
+INT32_COLS = ("year", "month")
+BOOL_COLS = ("is_winter",)
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.feather
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Parquet/Arrow output needs pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+def format_of(path: Path, fmt: str = None) -> str:
+    """Explicit fmt, else inferred from the suffix (CSV if unknown)."""
+    if fmt is not None:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown output format '{fmt}'. Available: {list(FORMATS)}")
+        return fmt
+    suffix = Path(path).suffix.lower()
+    for name, ext in FORMATS.items():
+        if suffix == ext:
+            return name
+    return "csv"
+
+def with_format(path: Path, fmt: str) -> Path:
+    """Same path with the suffix of `fmt`."""
+    return Path(path).with_suffix(FORMATS[format_of(path, fmt)])
+
+def find_output(stem: Path) -> Path:
+    """Most recently written <stem>.csv/.parquet/.arrow, or None."""
+    found = [Path(stem).with_suffix(ext) for ext in FORMATS.values()]
+    found = [p for p in found if p.exists()]
+    return max(found, key=lambda p: p.stat().st_mtime_ns) if found else None
+
+def columnar_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Compact dtypes for columnar formats (CSV output is left untouched)."""
+    out = df.copy()
+    for c in out.columns:
+        if c in INT32_COLS or c.endswith("_units"):
+            if pd.api.types.is_integer_dtype(out[c]):
+                out[c] = out[c].astype("int32")
+        elif c in BOOL_COLS:
+            out[c] = out[c].astype(bool)
+        elif c == "chain" or c.endswith("_model") or c.endswith("_unit_hash_unit"):
+            out[c] = out[c].astype("category")
+    return out
+
+# ---------- Single tables
+
+def write_frame(df: pd.DataFrame, path: Path, fmt: str = None) -> Path:
+    """Write df to path (suffix adjusted to the format); returns the written path."""
+    fmt = format_of(path, fmt)
+    path = with_format(path, fmt)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+        return path
+    pa = _pyarrow()
+    table = pa.Table.from_pandas(columnar_dtypes(df), preserve_index=False)
+    if fmt == "parquet":
+        pa.parquet.write_table(table, path)
+    else:
+        # Uncompressed IPC so reads can memory-map the file
+        pa.feather.write_feather(table, path, compression="uncompressed")
+    return path
+
+def read_frame(path: Path, columns: list = None, memory_map: bool = True) -> pd.DataFrame:
+    """Read a table written by write_frame, loading only `columns` if given."""
+    path = Path(path)
+    fmt = format_of(path)
+    if fmt == "csv":
+        return pd.read_csv(path, usecols=columns)
+    pa = _pyarrow()
+    if fmt == "parquet":
+        return pa.parquet.read_table(path, columns=columns, memory_map=memory_map).to_pandas()
+    return pa.feather.read_table(path, columns=columns, memory_map=memory_map).to_pandas()
+
+# ---------- Scenario-partitioned store
+
+def _partition_name(scenario) -> str:
+    name = re.sub(r"[^A-Za-z0-9_.-]+", "_", str(scenario)).strip("._")
+    if not name:
+        raise ValueError(f"Invalid scenario id: {scenario!r}")
+    return name
+
+def scenario_path(root: Path, scenario, fmt: str = "parquet") -> Path:
+    return Path(root) / f"scenario={_partition_name(scenario)}" / f"part{FORMATS[format_of(root, fmt)]}"
+
+def write_scenario(df: pd.DataFrame, root: Path, scenario, fmt: str = "parquet") -> Path:
+    """Write one scenario's table under <root>/scenario=<id>/."""
+    return write_frame(df, scenario_path(root, scenario, fmt), fmt)
+
+def read_scenarios(root: Path, columns: list = None, scenarios: list = None,
+                   fmt: str = "parquet") -> pd.DataFrame:
+    """Load selected scenarios (all if None) and columns from a partitioned store; adds a 'scenario' column."""
+    root = Path(root)
+    fmt = format_of(root, fmt)
+    wanted = None if scenarios is None else {_partition_name(s) for s in scenarios}
+    if fmt == "csv":
+        parts = []
+        for d in sorted(root.glob("scenario=*")):
+            sid = d.name.split("=", 1)[1]
+            if wanted is not None and sid not in wanted:
+                continue
+            part = read_frame(d / "part.csv", columns)
+            part.insert(0, "scenario", sid)
+            parts.append(part)
+        return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=["scenario"] + list(columns or []))
+
+    pa = _pyarrow()
+    ds = pa.dataset.dataset(root, format="parquet" if fmt == "parquet" else "ipc",
+                            partitioning=pa.dataset.partitioning(pa.schema([("scenario", pa.string())]), flavor="hive"))
+    flt = None if wanted is None else pa.dataset.field("scenario").isin(sorted(wanted))
+    cols = None if columns is None else ["scenario"] + [c for c in columns if c != "scenario"]
+    return ds.to_table(columns=cols, filter=flt).to_pandas()
@@ -0,0 +1,252 @@
+# scripts/package_data.py
+# Data packaging: data/packages/manifest.json, data/packages/data_csvs.zip, reports/DATA_SNAPSHOT.md
+# - Every CSV under data/ (recursive, so scenario outputs are included; data/packages is skipped)
+# - One chunked binary pass per file computes sha256, row count, headers and the first sample rows:
+#   rows are newlines outside quoted fields, so quoted multi-line cells count once
+# - Incremental: a manifest entry is reused as-is when the file's size and mtime_ns match the
+#   stored ones (no read at all); a file whose stat changed is re-hashed, and if its sha256 is the
+#   same only the stored stat is refreshed. --verify re-hashes everything
+# - The zip is only touched for changed members: new files are appended in place; when a member
+#   changed or a file was removed, unchanged members are copied as raw compressed bytes into the
+#   new archive (no re-read or re-compress of their CSVs)
+# - DATA_SNAPSHOT.md is rendered from the manifest and only rewritten when its text changes
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import zipfile
+import numpy as np
+from pathlib import Path
+
+CHUNK = 1 << 20
+SAMPLE_ROWS = 5
+
+# ---------- Scan
+
+def _count_records(chunk: bytes, in_quotes: bool) -> tuple:
+    """(newlines outside quoted fields, quote state after the chunk)."""
+    if b'"' not in chunk:
+        return (0 if in_quotes else chunk.count(b"\n")), in_quotes
+    # A newline is outside quotes when an even number of '"' precede it ("" escapes toggle twice)
+    a = np.frombuffer(chunk, dtype=np.uint8)
+    quotes = np.flatnonzero(a == 0x22)
+    before = np.searchsorted(quotes, np.flatnonzero(a == 0x0A)) + int(in_quotes)
+    return int(np.count_nonzero(before % 2 == 0)), in_quotes ^ (len(quotes) % 2 == 1)
+
+def _header_and_samples(head: bytes, n_samples: int) -> tuple:
+    reader = csv.reader(io.StringIO(head.decode("utf-8-sig", errors="replace"), newline=""))
+    rows = []
+    # Stop after the sample rows, before any truncated record at the end of the head
+    for row in reader:
+        if row:
+            rows.append(row)
+        if len(rows) > n_samples:
+            break
+    if not rows:
+        return [], []
+    # Blank header cells get pandas' names, as in the sheets ("Unnamed: 10")
+    headers = [h if h.strip() else f"Unnamed: {i}" for i, h in enumerate(rows[0])]
+    return headers, rows[1:]
+
+def scan_csv(path: Path, n_samples: int = SAMPLE_ROWS) -> dict:
+    """sha256, headers, row count (excluding the header) and sample rows in one chunked pass."""
+    sha = hashlib.sha256()
+    head, head_records = b"", 0
+    records, in_quotes, last = 0, False, b"\n"
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(CHUNK)
+            if not chunk:
+                break
+            sha.update(chunk)
+            n, in_quotes = _count_records(chunk, in_quotes)
+            records += n
+            last = chunk[-1:]
+            if head_records <= n_samples:
+                head += chunk
+                head_records += n
+    if last != b"\n":
+        records += 1  # no trailing newline
+    headers, samples = _header_and_samples(head, n_samples)
+    return {
+        "sha256": sha.hexdigest(),
+        "headers": headers,
+        "row_count": max(records - 1, 0),
+        "sample_rows": samples,
+    }
+
+def csv_files(repo_root: Path, data_dir: str = "data", exclude: str = "data/packages") -> list:
+    """Repo-relative paths of every CSV under data_dir, sorted, skipping the package dir."""
+    root = repo_root / data_dir
+    skip = (repo_root / exclude).resolve()
+    out = []
+    for p in root.rglob("*.csv"):
+        if skip in p.resolve().parents:
+            continue
+        out.append(p.relative_to(repo_root).as_posix())
+    return sorted(out)
+
+# ---------- Manifest
+
+def load_manifest(path: Path) -> dict:
+    """{repo-relative path: entry} from an existing manifest.json (empty if missing or unreadable)."""
+    try:
+        files = json.loads(path.read_text())["files"]
+    except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError):
+        return {}
+    return {e["path"]: e for e in files if isinstance(e, dict) and "path" in e}
+
+def build_manifest(repo_root: Path, old: dict, paths: list, verify: bool = False) -> tuple:
+    """(entries in path order, {path: "new" | "changed" | "touched" | "reused"})."""
+    entries, status = [], {}
+    for rel in paths:
+        st = (repo_root / rel).stat()
+        prev = old.get(rel)
+        if (not verify and prev is not None and prev.get("size") == st.st_size
+                and prev.get("mtime_ns") == st.st_mtime_ns and "sha256" in prev):
+            entries.append(prev)
+            status[rel] = "reused"
+            continue
+        scanned = scan_csv(repo_root / rel)
+        if prev is not None and prev.get("sha256") == scanned["sha256"]:
+            status[rel] = "touched" if (prev.get("size"), prev.get("mtime_ns")) != (st.st_size, st.st_mtime_ns) else "reused"
+        else:
+            status[rel] = "changed" if prev is not None else "new"
+        entries.append({"path": rel, **scanned, "size": st.st_size, "mtime_ns": st.st_mtime_ns})
+    return entries, status
+
+# ---------- Zip
+
+def _copy_raw(zin: zipfile.ZipFile, zout: zipfile.ZipFile, names: list):
+    """Copy members' local header + compressed data byte for byte (no decompress / recompress)."""
+    infos = sorted(zin.infolist(), key=lambda i: i.header_offset)
+    ends = [i.header_offset for i in infos[1:]] + [zin.start_dir]
+    span = {i.filename: (i, end) for i, end in zip(infos, ends)}
+    for name in names:
+        info, end = span[name]
+        zin.fp.seek(info.header_offset)
+        offset = zout.fp.tell()
+        zout.fp.write(zin.fp.read(end - info.header_offset))
+        info.header_offset = offset
+        zout.filelist.append(info)
+        zout.NameToInfo[name] = info
+    zout.start_dir = zout.fp.tell()
+
+def update_zip(repo_root: Path, zip_path: Path, entries: list, changed: set) -> dict:
+    """
+    Bring zip_path in line with the manifest entries (`changed`: paths whose content changed);
+    returns counts of kept / added / replaced / removed members.
+    """
+    wanted = {e["path"]: e for e in entries}
+    members = {}
+    if zip_path.exists():
+        try:
+            with zipfile.ZipFile(zip_path) as z:
+                members = {i.filename: i.file_size for i in z.infolist()}
+        except zipfile.BadZipFile:
+            members = {}
+    # A member is current when its file kept its hash; the size check catches a stale zip
+    current = {p for p, e in wanted.items() if members.get(p) == e["size"] and p not in changed}
+    add = [p for p in wanted if p not in members]
+    replace = [p for p in wanted if p in members and p not in current]
+    remove = [p for p in members if p not in wanted]
+    counts = {"kept": len(current), "added": len(add), "replaced": len(replace), "removed": len(remove)}
+    if not (add or replace or remove) and zip_path.exists():
+        return counts
+
+    zip_path.parent.mkdir(parents=True, exist_ok=True)
+    if not (replace or remove):
+        # Only new files: append in place
+        with zipfile.ZipFile(zip_path, "a" if members else "w", zipfile.ZIP_DEFLATED) as z:
+            for p in add:
+                z.write(repo_root / p, p)
+        return counts
+
+    tmp = zip_path.with_suffix(zip_path.suffix + ".tmp")
+    with zipfile.ZipFile(zip_path) as zin, zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as zout:
+        _copy_raw(zin, zout, sorted(current))
+        for p in sorted(add + replace):
+            zout.write(repo_root / p, p)
+    os.replace(tmp, zip_path)
+    return counts
+
+# ---------- Snapshot
+
+def _cell(v) -> str:
+    return str(v).replace("|", "\\|").replace("\n", " ")
+
+def render_snapshot(entries: list) -> str:
+    """reports/DATA_SNAPSHOT.md text for the manifest entries."""
+    lines = ["# Data Snapshot", ""]
+    for e in entries:
+        headers = e["headers"]
+        lines += [
+            f"## `{e['path']}`",
+            "",
+            f"- Rows: **{e['row_count']}**",
+            f"- SHA256: `{e['sha256']}`",
+            "",
+            "**Headers**",
+            "",
+            f"`{', '.join(headers)}`",
+            "",
+            f"**First {SAMPLE_ROWS} rows**",
+            "",
+            "| " + " | ".join(_cell(h) for h in headers) + " |",
+            "|" + "---|" * len(headers),
+        ]
+        for row in e["sample_rows"]:
+            row = list(row) + [""] * (len(headers) - len(row))
+            lines.append("| " + " | ".join(_cell(v) for v in row) + " |")
+        lines.append("")
+    return "\n".join(lines).rstrip("\n") + "\n"
+
+def _write_if_changed(path: Path, text: str) -> bool:
+    if path.exists() and path.read_text() == text:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return True
+
+# ---------- Driver
+
+def package_data(repo_root: Path, out_dir: str = "data/packages", report: str = "reports/DATA_SNAPSHOT.md",
+                 verify: bool = False) -> dict:
+    """Refresh manifest, zip and snapshot; returns per-file status and zip counts."""
+    repo_root = Path(repo_root)
+    manifest_path = repo_root / out_dir / "manifest.json"
+    old = load_manifest(manifest_path)
+    paths = csv_files(repo_root, exclude=out_dir)
+    entries, status = build_manifest(repo_root, old, paths, verify)
+    changed = {p for p, s in status.items() if s in ("new", "changed")}
+    zip_counts = update_zip(repo_root, repo_root / out_dir / "data_csvs.zip", entries, changed)
+
+    text = json.dumps({"files": entries}, indent=2)
+    manifest_written = _write_if_changed(manifest_path, text)
+    snapshot_written = _write_if_changed(repo_root / report, render_snapshot(entries))
+    return {"status": status, "zip": zip_counts, "manifest_written": manifest_written,
+            "snapshot_written": snapshot_written}
+
+# ---------- CLI
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Build data/packages/{manifest.json,data_csvs.zip} and reports/DATA_SNAPSHOT.md")
+    ap.add_argument("--out-dir", default="data/packages")
+    ap.add_argument("--report", default="reports/DATA_SNAPSHOT.md")
+    ap.add_argument("--verify", action="store_true", help="re-hash every file even if size and mtime match")
+    args = ap.parse_args()
+
+    repo_root = Path(".")
+    if not (repo_root / "data").is_dir():
+        raise SystemExit("Missing data/ directory (run from the repo root)")
+    result = package_data(repo_root, args.out_dir, args.report, args.verify)
+    counts = {}
+    for s in result["status"].values():
+        counts[s] = counts.get(s, 0) + 1
+    print("Files: " + ", ".join(f"{counts.get(k, 0)} {k}" for k in ("new", "changed", "touched", "reused")))
+    print("Zip: " + ", ".join(f"{v} {k}" for k, v in result["zip"].items()))
+    for name, written in (("manifest.json", result["manifest_written"]), ("DATA_SNAPSHOT.md", result["snapshot_written"])):
+        print(f"{name}: {'written' if written else 'unchanged'}")
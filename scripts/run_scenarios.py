@@ -0,0 +1,201 @@
+# scripts/run_scenarios.py
+# Parallel scenario runner: many assumptions.json variants through the build_all pipeline at once
+# - Scenarios: a directory of *.json files (id = file stem) or a JSONL file (id = "id" key or line
+#   number). Each scenario holds overrides of config/assumptions.json: nested blocks are merged,
+#   dotted keys ("btc.base_price_usd") address one nested value, like the sweep spec
+# - Scenarios fan out over a process pool. The parent parses every referenced miner sheet once;
+#   the pool initializer hands the parsed tables to each worker (miner_catalog memo), so workers
+#   never re-read a sheet and only import pandas once
+# - Output, per scenario (default): <out-dir>/{monthly,accrual,cash}/scenario=<id>/part.<ext>
+#   (the output_writer store layout; stream_annual.py reads it). Workers write their own files,
+#   so only a small summary row travels back to the parent
+# - --consolidate: one table per stage with a "scenario" column instead
+#   (<out-dir>/scenarios_monthly.*, scenarios_annual_pnl_accrual.*, scenarios_annual_pnl_cash.*)
+# - A scenario that fails validation is reported in summary.csv and does not stop the others;
+#   the exit code is 1 if any failed
+
+import argparse
+import copy
+import json
+import os
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import miner_catalog
+from build_all import run_pipeline
+from build_monthly_model import round_monthly
+from instrument import add_cli_args, configure_from_args, stage
+from output_writer import FORMATS, _partition_name, with_format, write_frame, write_scenario
+
+STAGES = ("monthly", "accrual", "cash")
+# summary.csv schema, fixed whether or not a scenario failed (failed rows leave the numbers empty)
+SUMMARY_DTYPES = {
+    "scenario": "object",
+    "status": "object",
+    "error": "object",
+    "months": "Int64",
+    "accrual_operating_profit": "float64",
+    "cash_operating_profit": "float64",
+}
+
+# ---------- Scenario specs
+
+def _apply_overrides(base: dict, overrides: dict) -> dict:
+    """Copy of `base` with `overrides` merged in (nested dicts merged, dotted keys as paths)."""
+    out = copy.deepcopy(base)
+    for key, value in overrides.items():
+        node, parts = out, key.split(".")
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+            if not isinstance(node, dict):
+                raise ValueError(f"override '{key}': '{part}' is not a block")
+        last = parts[-1]
+        if isinstance(value, dict) and isinstance(node.get(last), dict):
+            node[last] = _apply_overrides(node[last], value)
+        else:
+            node[last] = copy.deepcopy(value)
+    return out
+
+def _scenario_entry(obj: dict, default_id: str) -> tuple:
+    if not isinstance(obj, dict):
+        raise ValueError(f"scenario {default_id}: expected a JSON object")
+    sid = str(obj.get("id", default_id))
+    overrides = obj["assumptions"] if "assumptions" in obj else {k: v for k, v in obj.items() if k != "id"}
+    return sid, overrides
+
+def load_scenarios(source: Path) -> list:
+    """[(scenario id, overrides)] from a directory of *.json files or a .jsonl file."""
+    source = Path(source)
+    if source.is_dir():
+        entries = [_scenario_entry(json.loads(p.read_text()), p.stem) for p in sorted(source.glob("*.json"))]
+    else:
+        entries = []
+        for n, line in enumerate(source.read_text().splitlines(), start=1):
+            if line.strip():
+                entries.append(_scenario_entry(json.loads(line), str(n)))
+    if not entries:
+        raise ValueError(f"No scenarios in {source}")
+    # Ids that clean to the same partition directory ("a b" / "a/b") would overwrite each other
+    seen = {}
+    for sid, _ in entries:
+        name = _partition_name(sid)
+        if name in seen:
+            raise ValueError(f"Duplicate scenario id: {seen[name]!r} and {sid!r} both write scenario={name}")
+        seen[name] = sid
+    return entries
+
+def _sheet_paths(assumptions: dict, repo_root: Path) -> set:
+    """Every miner sheet a config reads (chain blocks + fleets)."""
+    blocks = [v for v in assumptions.values() if isinstance(v, dict)] + list(assumptions.get("fleets", []))
+    return {repo_root / b["source_csv"] for b in blocks if "source_csv" in b}
+
+# ---------- Workers
+
+_WORKER = {}
+
+def _init_worker(repo_root: Path, sheets: dict):
+    """Pool initializer: seed this process's catalog memo with the parent's parsed sheets."""
+    miner_catalog._SHEET_MEMO.update(sheets)
+    _WORKER["repo_root"] = repo_root
+
+def _run_one(job: tuple):
+    """One scenario through the pipeline; writes it (store mode) or returns its frames (consolidate)."""
+    sid, assumptions, out_dir, fmt, consolidate = job
+    try:
+        monthly, accrual, cash = run_pipeline(assumptions, _WORKER["repo_root"])
+    except (ValueError, KeyError, TypeError, FileNotFoundError) as e:
+        return {"scenario": sid, "status": "error", "error": str(e)}, None
+    monthly = round_monthly(monthly)
+    row = {
+        "scenario": sid,
+        "status": "ok",
+        "error": "",
+        "months": len(monthly),
+        "accrual_operating_profit": round(float(accrual["operating_profit_total"].sum()), 2),
+        "cash_operating_profit": round(float(cash["operating_profit_total"].sum()), 2),
+    }
+    frames = {"monthly": monthly, "accrual": accrual, "cash": cash}
+    if consolidate:
+        return row, frames
+    for name, df in frames.items():
+        write_scenario(df, out_dir / name, sid, fmt)
+    return row, None
+
+# ---------- Driver
+
+def run_scenarios(assumptions: dict, scenarios: list, repo_root: Path, out_dir: Path, fmt: str = "csv",
+                  consolidate: bool = False, workers: int = 0, chunksize: int = 1) -> pd.DataFrame:
+    """Run every (id, overrides) scenario; returns the summary (one row per scenario, input order)."""
+    confs = [(sid, _apply_overrides(assumptions, overrides)) for sid, overrides in scenarios]
+    jobs = [(sid, conf, out_dir, fmt, consolidate) for sid, conf in confs]
+
+    with stage("catalog"):
+        sheets = set()
+        for _, conf in confs:
+            sheets |= _sheet_paths(conf, repo_root)
+        for path in sorted(sheets):
+            if path.exists():
+                miner_catalog.read_sheet(path)  # a missing sheet fails in its own scenario
+        memo = dict(miner_catalog._SHEET_MEMO)
+
+    with stage("scenarios", rows=len(jobs)):
+        if workers and workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(repo_root, memo)) as pool:
+                results = list(pool.map(_run_one, jobs, chunksize=max(1, chunksize)))
+        else:
+            _init_worker(repo_root, memo)
+            results = [_run_one(job) for job in jobs]
+
+    if consolidate:
+        with stage("consolidate"):
+            names = {"monthly": "scenarios_monthly", "accrual": "scenarios_annual_pnl_accrual",
+                     "cash": "scenarios_annual_pnl_cash"}
+            for name in STAGES:
+                parts = [frames[name].assign(scenario=row["scenario"]) for row, frames in results if frames]
+                if parts:
+                    df = pd.concat(parts, ignore_index=True)
+                    df = df[["scenario"] + [c for c in df.columns if c != "scenario"]]
+                    write_frame(df, with_format(out_dir / names[name], fmt), fmt)
+    summary = pd.DataFrame([row for row, _ in results], columns=list(SUMMARY_DTYPES))
+    return summary.astype(SUMMARY_DTYPES)
+
+# ---------- CLI
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Run many assumptions.json variants in parallel")
+    ap.add_argument("scenarios", help="directory of *.json overrides or a .jsonl file")
+    ap.add_argument("--assumptions", default="config/assumptions.json", help="base config the overrides apply to")
+    ap.add_argument("--out-dir", default="data/scenarios")
+    ap.add_argument("--format", choices=list(FORMATS), default="csv")
+    ap.add_argument("--consolidate", action="store_true", help="one table per stage with a scenario column")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="process pool size (0/1 = in-process)")
+    ap.add_argument("--chunksize", type=int, default=1, help="scenarios handed to a worker at a time")
+    add_cli_args(ap)
+    args = ap.parse_args()
+    configure_from_args(args)
+
+    repo_root = Path(".")
+    conf_path = repo_root / args.assumptions
+    if not conf_path.exists():
+        raise SystemExit(f"Missing assumptions file: {conf_path}")
+    source = repo_root / args.scenarios
+    if not source.exists():
+        raise SystemExit(f"Missing scenarios: {source}")
+    assumptions = json.loads(conf_path.read_text())
+    try:
+        scenarios = load_scenarios(source)
+    except (ValueError, json.JSONDecodeError) as e:
+        raise SystemExit(f"Bad scenarios file: {e}")
+
+    out_dir = repo_root / args.out_dir
+    summary = run_scenarios(assumptions, scenarios, repo_root, out_dir, args.format,
+                            args.consolidate, args.workers, args.chunksize)
+    out = write_frame(summary, out_dir / "summary.csv", "csv")
+    failed = summary[summary["status"] != "ok"]
+    print(f"Ran {len(summary)} scenarios ({len(failed)} failed) -> {out_dir}; summary {out}")
+    for _, row in failed.iterrows():
+        print(f"  {row['scenario']}: {row['error']}")
+    if len(failed):
+        raise SystemExit(1)
@@ -0,0 +1,199 @@
+# scripts/stream_annual.py
+# Streaming annual aggregation: accrual + cash P&L in one pass with bounded memory
+# - Reads the monthly model in row chunks (CSV chunks, Parquet record batches, slices of a
+#   memory-mapped Arrow IPC file) and only the columns the two P&Ls need
+# - Inputs: one monthly table (optionally stacked, with a "scenario" column) or a
+#   scenario-partitioned store directory (<root>/scenario=<id>/part.*, see output_writer.py)
+# - Running per-(scenario, year) sums live in one float array that grows with the number of keys,
+#   not rows; chunks are reduced with bincount and added with compensated (Kahan) summation
+# - Totals, profits and margins (_safe_margin) are computed once, on the final sums, by the same
+#   finish_accrual / finish_cash used by build_annual_pnl_accrual.py / build_annual_pnl_cash.py
+# - Writes data/annual_pnl_accrual.csv + data/annual_pnl_cash.csv (*_by_scenario.csv when the
+#   input has scenarios)
+
+import argparse
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from build_annual_pnl_accrual import finish_accrual
+from build_annual_pnl_cash import finish_cash
+from build_fleet_model import chain_names
+from instrument import add_cli_args, configure_from_args, stage
+from output_writer import FORMATS, _pyarrow, find_output, format_of, write_frame
+
+SCENARIO = "scenario"
+
+# ---------- Chunk readers
+
+def _table_columns(path: Path) -> list:
+    fmt = format_of(path)
+    if fmt == "csv":
+        return list(pd.read_csv(path, nrows=0).columns)
+    pa = _pyarrow()
+    if fmt == "parquet":
+        return pa.parquet.ParquetFile(path).schema_arrow.names
+    with pa.memory_map(str(path)) as source:
+        return pa.ipc.open_file(source).schema.names
+
+def _file_chunks(path: Path, columns: list, chunk_rows: int):
+    """Yield {column: ndarray} chunks of at most chunk_rows rows."""
+    fmt = format_of(path)
+    if fmt == "csv":
+        for part in pd.read_csv(path, usecols=columns, chunksize=chunk_rows):
+            yield {c: part[c].to_numpy() for c in columns}
+        return
+    pa = _pyarrow()
+    if fmt == "parquet":
+        batches = pa.parquet.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=columns)
+        for batch in batches:
+            yield {c: batch.column(c).to_numpy(zero_copy_only=False) for c in columns}
+        return
+    with pa.memory_map(str(path)) as source:
+        # Zero-copy view of the mapped file; only each chunk's slice is materialized
+        table = pa.ipc.open_file(source).read_all().select(columns)
+        for lo in range(0, table.num_rows, chunk_rows):
+            part = table.slice(lo, chunk_rows)
+            yield {c: part.column(c).to_numpy() for c in columns}
+
+def iter_monthly_chunks(source: Path, columns: list, chunk_rows: int = 500_000):
+    """
+    Chunks of `columns` (+ "scenario" when the source has one) from a monthly table or a
+    scenario-partitioned store directory.
+    """
+    source = Path(source)
+    if source.is_dir():
+        parts = sorted(p for p in source.glob("scenario=*/part.*") if p.suffix in FORMATS.values())
+        if not parts:
+            raise FileNotFoundError(f"No scenario partitions under {source}")
+        for part in parts:
+            scenario = part.parent.name.split("=", 1)[1]
+            for chunk in _file_chunks(part, columns, chunk_rows):
+                chunk[SCENARIO] = np.full(len(chunk[columns[0]]), scenario, dtype=object)
+                yield chunk
+        return
+    available = _table_columns(source)
+    missing = [c for c in columns if c not in available]
+    if missing:
+        raise KeyError(f"{source.name}: missing column(s) {missing}")
+    wanted = columns + ([SCENARIO] if SCENARIO in available else [])
+    yield from _file_chunks(source, wanted, chunk_rows)
+
+# ---------- Accumulator
+
+class YearSums:
+    """Running per-(scenario, year) column sums; memory grows with keys, not rows."""
+
+    def __init__(self, columns: list, capacity: int = 64):
+        self.columns = list(columns)
+        self.keys = {}
+        self.sums = np.zeros((capacity, len(columns)))
+        self.comp = np.zeros_like(self.sums)  # Kahan compensation
+        self.has_scenario = False
+
+    def _slots(self, keys: list) -> np.ndarray:
+        for k in keys:
+            if k not in self.keys:
+                self.keys[k] = len(self.keys)
+        if len(self.keys) > len(self.sums):
+            grow = max(len(self.keys), 2 * len(self.sums)) - len(self.sums)
+            self.sums = np.vstack([self.sums, np.zeros((grow, len(self.columns)))])
+            self.comp = np.vstack([self.comp, np.zeros((grow, len(self.columns)))])
+        return np.fromiter((self.keys[k] for k in keys), dtype=np.int64, count=len(keys))
+
+    def add(self, chunk: dict):
+        year = np.asarray(chunk["year"]).astype(np.int64)
+        if len(year) == 0:
+            return
+        if SCENARIO in chunk:
+            self.has_scenario = True
+            scen_vals, scen_pos = np.unique(np.asarray(chunk[SCENARIO]), return_inverse=True)
+            scen_vals = scen_vals.tolist()
+        else:
+            scen_vals, scen_pos = [0], np.zeros(len(year), dtype=np.int64)
+        year_vals, year_pos = np.unique(year, return_inverse=True)
+        n_years = len(year_vals)
+        local, inverse = np.unique(scen_pos.ravel() * n_years + year_pos.ravel(), return_inverse=True)
+        year_vals = year_vals.tolist()
+        slots = self._slots([(scen_vals[k // n_years], year_vals[k % n_years]) for k in local.tolist()])
+
+        def weights(c):
+            v = np.asarray(chunk[c], dtype=float)
+            return np.where(np.isnan(v), 0.0, v)  # missing months count as 0, like groupby().sum()
+        part = np.column_stack([np.bincount(inverse.ravel(), weights=weights(c), minlength=len(local))
+                                for c in self.columns])
+        y = part - self.comp[slots]
+        t = self.sums[slots] + y
+        self.comp[slots] = (t - self.sums[slots]) - y
+        self.sums[slots] = t
+
+    def frame(self) -> pd.DataFrame:
+        """Final sums sorted by (scenario, year); no scenario column for single-scenario input."""
+        keys = sorted(self.keys)
+        rows = np.array([self.keys[k] for k in keys], dtype=np.int64)
+        df = pd.DataFrame({"year": np.array([k[1] for k in keys], dtype=np.int64)})
+        if self.has_scenario:
+            df.insert(0, SCENARIO, [k[0] for k in keys])
+        for j, c in enumerate(self.columns):
+            df[c] = self.sums[rows, j] if len(rows) else np.zeros(0)
+        return df
+
+# ---------- Aggregation
+
+def stream_annual(source: Path, chains: list, chunk_rows: int = 500_000) -> tuple:
+    """(accrual, cash) annual tables from one chunked pass over `source`."""
+    money = ([f"{c}_revenue_accrual" for c in chains] + [f"{c}_cash_sales" for c in chains]
+             + [f"{c}_power_cost" for c in chains])
+    acc = YearSums(money)
+    with stage("aggregate") as rec:
+        rows = 0
+        for chunk in iter_monthly_chunks(source, ["year"] + money, chunk_rows):
+            acc.add(chunk)
+            rows += len(chunk["year"])
+        rec["rows"] = rows
+    sums = acc.frame()
+    keys = [k for k in (SCENARIO, "year") if k in sums.columns]
+    accrual = finish_accrual(sums[keys + [f"{c}_revenue_accrual" for c in chains]
+                                  + [f"{c}_power_cost" for c in chains]].copy(), chains)
+    cash = finish_cash(sums[keys + [f"{c}_cash_sales" for c in chains]
+                            + [f"{c}_power_cost" for c in chains]].copy(), chains)
+    return accrual, cash
+
+# ---------- CLI
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Annual accrual + cash P&L in one streaming pass")
+    ap.add_argument("--monthly", default=None,
+                    help="monthly table or scenario store dir (default: newest data/monthly_model_2025_2030.*)")
+    ap.add_argument("--chunk-rows", type=int, default=500_000)
+    ap.add_argument("--format", choices=list(FORMATS), default="csv")
+    add_cli_args(ap)
+    args = ap.parse_args()
+    configure_from_args(args)
+
+    repo_root = Path(".")
+    conf_path = repo_root / "config" / "assumptions.json"
+    if not conf_path.exists():
+        raise SystemExit(f"Missing assumptions file: {conf_path}")
+    assumptions = json.loads(conf_path.read_text())
+
+    if args.monthly is None:
+        stem = repo_root / "data" / "monthly_model_2025_2030"
+        source = find_output(stem)
+        if source is None:
+            raise SystemExit(f"Missing monthly model CSV: {stem.with_suffix('.csv')}")
+    else:
+        source = repo_root / args.monthly
+        if not source.exists():
+            raise SystemExit(f"Missing monthly model: {source}")
+    try:
+        accrual, cash = stream_annual(source, chain_names(assumptions), args.chunk_rows)
+    except KeyError as e:
+        raise SystemExit(f"Monthly model missing column(s): {e}")
+
+    suffix = "_by_scenario" if SCENARIO in accrual.columns else ""
+    for df, name in ((accrual, f"annual_pnl_accrual{suffix}.csv"), (cash, f"annual_pnl_cash{suffix}.csv")):
+        with stage("write", rows=len(df)):
+            out = write_frame(df, repo_root / "data" / name, args.format)
+        print(f"Wrote {out}")
@@ -0,0 +1,233 @@
+# scripts/sweep_assumptions.py
+# Sensitivity / grid sweep over config/assumptions.json knobs
+# - Reads a sweep spec (JSON) mapping knob -> list of values or {"start","stop","num"}
+#   e.g. {"elec_rate_usd_per_kwh": [0.06, 0.081], "btc.base_price_usd": {"start": 80000, "stop": 160000, "num": 9}}
+# - Evaluates the full Cartesian grid as broadcast (scenario x month) arrays, in scenario chunks
+# - Writes one row per scenario per year with accrual and cash operating profit (cash: treasury.py
+#   sell policy applied to every scenario's coin lots at once)
+# - Coin math uses the shared mining_core helpers (hashrate units, _monthly_coins, so emission
+#   schedules apply); one btc + one etc
+#   fleet only, so a config with the "chains"/"fleets" layout is rejected
+# - Money is kept in full precision and rounded to 2 decimals on output
+# - --capital adds per-scenario capex / NPV / IRR / payback per chain (capital.py, vectorized)
+# - --out suffix picks the format: .csv, .parquet or .arrow (columnar formats need pyarrow)
+
+import argparse
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from build_fleet_model import multi_fleet
+from instrument import add_cli_args, configure_from_args, stage
+from mining_core import (
+    _extract_specs, _fleet_hashrate_hs, _month_calendar, _monthly_coins, _parse_hashrate, _validate_chain_conf,
+)
+from output_writer import write_frame
+from treasury import cash_sales, treasury_policy
+
+CHAINS = ("btc", "etc")
+GLOBAL_KNOBS = ("elec_rate_usd_per_kwh", "annual_power_pct")
+CHAIN_KNOBS = (
+    "base_price_usd", "annual_price_pct", "annual_difficulty_pct",
+    "network_hashrate", "units", "pool_fee_pct", "block_reward",
+)
+
+# ---------- Spec
+
+def _knob_values(name: str, spec) -> np.ndarray:
+    """Expand one knob spec (list or {"start","stop","num"}) into a float array."""
+    conv = _parse_hashrate if name.endswith("network_hashrate") else float
+    if isinstance(spec, dict):
+        missing = [k for k in ("start", "stop", "num") if k not in spec]
+        if missing:
+            raise ValueError(f"{name}: range spec missing {missing}")
+        values = np.linspace(conv(spec["start"]), conv(spec["stop"]), int(spec["num"]))
+    elif isinstance(spec, (list, tuple)):
+        values = np.array([conv(v) for v in spec], dtype=float)
+    else:
+        values = np.array([conv(spec)], dtype=float)
+    if values.size == 0:
+        raise ValueError(f"{name}: no values to sweep")
+    return values
+
+def _parse_sweep(sweep: dict) -> dict:
+    """Validate knob names and expand their values, preserving spec order."""
+    knobs = {}
+    for name, spec in sweep.items():
+        chain, _, key = name.rpartition(".")
+        if chain == "" and key in GLOBAL_KNOBS:
+            pass
+        elif chain in CHAINS and key in CHAIN_KNOBS:
+            pass
+        else:
+            raise ValueError(
+                f"Unknown sweep knob '{name}'. Global: {list(GLOBAL_KNOBS)}; "
+                f"per chain (prefix btc./etc.): {list(CHAIN_KNOBS)}"
+            )
+        knobs[name] = _knob_values(name, spec)
+    return knobs
+
+def _grid_chunk(knobs: dict, shape: tuple, lo: int, hi: int) -> dict:
+    """Knob values for scenarios [lo, hi) of the Cartesian grid (C order, last knob fastest)."""
+    idx = np.unravel_index(np.arange(lo, hi), shape) if shape else ()
+    return {name: values[i] for (name, values), i in zip(knobs.items(), idx)}
+
+# ---------- Broadcast engine
+
+def _year_growth(rate: np.ndarray, n_years: int) -> np.ndarray:
+    """(scenarios, years) matrix of (1 + rate) ** year_index."""
+    return (1.0 + rate)[:, None] ** np.arange(n_years)[None, :]
+
+def _chain_monthly(name: str, conf: dict, specs: tuple, grid: dict, n: int,
+                   cal: dict, winter_days: np.ndarray, elec: np.ndarray) -> tuple:
+    """(scenarios, months) revenue, power cost, coins mined and price arrays for one chain."""
+    per_unit_hash, unit_kind, power_w_each = specs
+
+    def knob(key, default):
+        v = grid.get(f"{name}.{key}")
+        return np.full(n, float(default)) if v is None else v
+
+    units = knob("units", conf["units"])
+    net_hs = grid.get(f"{name}.network_hashrate")
+    if net_hs is None:
+        net_hs = np.full(n, _parse_hashrate(conf["network_hashrate"]))
+    reward = knob("block_reward", conf["block_reward"])
+    fee = knob("pool_fee_pct", conf.get("pool_fee_pct", 0.0))
+    price0 = knob("base_price_usd", conf["base_price_usd"])
+    price_g = knob("annual_price_pct", conf.get("annual_price_pct", 0.0))
+    diff_g = knob("annual_difficulty_pct", conf.get("annual_difficulty_pct", 0.0))
+
+    if np.any(units <= 0):
+        raise ValueError(f"{name}: units must be > 0")
+    if np.any(net_hs <= 0):
+        raise ValueError(f"{name}: network_hashrate must be > 0")
+
+    my_hs = units * _fleet_hashrate_hs(1, per_unit_hash, unit_kind)
+    if np.any(my_hs > net_hs):
+        raise ValueError(f"{name}: fleet hashrate exceeds network hashrate in some scenarios")
+
+    if "emission" in conf and f"{name}.block_reward" in grid:
+        raise ValueError(f"{name}: block_reward cannot be swept with an emission schedule")
+
+    # Coins per month are linear in share, (1 - fee) and the static block_reward, so the shared
+    # issuance (_monthly_coins, emission schedules included) is computed for a full network share
+    # at unit reward and no fee, once per distinct difficulty growth, then scaled per scenario
+    unit_conf = dict(conf, units=1, network_hashrate=1.0, block_reward=1.0, pool_fee_pct=0.0)
+    growths, which = np.unique(diff_g, return_inverse=True)
+    curves = np.stack([_monthly_coins(dict(unit_conf, annual_difficulty_pct=g), (1.0, "H/s", 0.0), cal)
+                       for g in growths])
+    scale = (my_hs / net_hs) * (1.0 - fee) * (1.0 if "emission" in conf else reward)
+    coins = scale[:, None] * curves[which] * (winter_days > 0)[None, :]
+
+    n_years = int(cal["year_index"].max()) + 1
+    price = (price0[:, None] * _year_growth(price_g, n_years))[:, cal["year_index"]]
+    revenue = coins * price
+
+    kwh_day = units * power_w_each * 24 / 1000.0
+    power_cost = kwh_day[:, None] * winter_days[None, :] * elec
+    return revenue, power_cost, coins, price
+
+def run_sweep(assumptions: dict, sweep: dict, repo_root: Path, chunk_size: int = 20000) -> pd.DataFrame:
+    """Evaluate every knob combination; one row per scenario per calendar year."""
+    if multi_fleet(assumptions):
+        raise ValueError("sweep: the chains/fleets layout is not supported; sweep one btc + one etc fleet")
+    knobs = _parse_sweep(sweep)
+    shape = tuple(len(v) for v in knobs.values())
+    n_scenarios = int(np.prod(shape)) if shape else 1
+
+    cal = _month_calendar(assumptions["start_month"], assumptions["end_month"])
+    winter = list(assumptions.get("winter_months", [10,11,12,1,2,3,4]))
+    policies = {name: treasury_policy(assumptions, assumptions[name]) for name in CHAINS}
+    winter_days = np.where(np.isin(cal["month"], winter), cal["days"], 0).astype(float)
+
+    specs = {}
+    with stage("specs"):
+        for name in CHAINS:
+            _validate_chain_conf(name, assumptions[name])
+            conf = assumptions[name]
+            specs[name] = _extract_specs(repo_root / conf["source_csv"], conf["model_name"])
+
+    years, year_pos = np.unique(cal["year"], return_inverse=True)
+    to_year = np.zeros((len(cal["year"]), len(years)))
+    to_year[np.arange(len(year_pos)), year_pos] = 1.0
+
+    n_years = len(years)
+    out = {f"{c}_{basis}_operating_profit": np.empty(n_scenarios * n_years)
+           for basis in ("accrual", "cash") for c in CHAINS}
+    knob_cols = {name: np.empty(n_scenarios) for name in knobs}
+
+    for lo in range(0, n_scenarios, chunk_size):
+        hi = min(lo + chunk_size, n_scenarios)
+        n = hi - lo
+        with stage("chunk", first_scenario=lo, rows=n):
+            grid = _grid_chunk(knobs, shape, lo, hi)
+            for name, values in grid.items():
+                knob_cols[name][lo:hi] = values
+
+            elec0 = grid.get("elec_rate_usd_per_kwh", np.full(n, float(assumptions.get("elec_rate_usd_per_kwh", 0.081))))
+            power_g = grid.get("annual_power_pct", np.full(n, float(assumptions.get("annual_power_pct", 0.0))))
+            elec = (elec0[:, None] * _year_growth(power_g, int(cal["year_index"].max()) + 1))[:, cal["year_index"]]
+
+            rows = slice(lo * n_years, hi * n_years)
+            for c in CHAINS:
+                revenue, power_cost, coins, price = _chain_monthly(c, assumptions[c], specs[c], grid, n, cal,
+                                                                   winter_days, elec)
+                power_y = power_cost @ to_year
+                cash = cash_sales(coins, price, policies[c])
+                out[f"{c}_accrual_operating_profit"][rows] = (revenue @ to_year - power_y).ravel()
+                out[f"{c}_cash_operating_profit"][rows] = (cash @ to_year - power_y).ravel()
+
+    with stage("frame", rows=n_scenarios * n_years):
+        df = pd.DataFrame({"scenario": np.repeat(np.arange(n_scenarios), n_years)})
+        for name, values in knob_cols.items():
+            df[name] = np.repeat(values, n_years)
+        df["year"] = np.tile(years, n_scenarios)
+        for basis in ("accrual", "cash"):
+            for c in CHAINS:
+                col = f"{c}_{basis}_operating_profit"
+                df[col] = out[col].round(2)
+            df[f"{basis}_operating_profit_total"] = sum(out[f"{c}_{basis}_operating_profit"] for c in CHAINS).round(2)
+    return df
+
+# ---------- CLI
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Grid sweep over assumptions.json knobs")
+    ap.add_argument("sweep", help="JSON sweep spec, e.g. config/sweep.json")
+    ap.add_argument("--assumptions", default="config/assumptions.json")
+    ap.add_argument("--out", default="data/sensitivity_grid.csv",
+                    help="format from the suffix: .csv, .parquet or .arrow")
+    ap.add_argument("--chunk-size", type=int, default=20000)
+    ap.add_argument("--capital", action="store_true",
+                    help="also write per-scenario capex / NPV / IRR / payback (capital.py) to <out>_capital")
+    add_cli_args(ap)
+    args = ap.parse_args()
+    configure_from_args(args)
+
+    repo_root = Path(".")
+    conf_path = repo_root / args.assumptions
+    sweep_path = repo_root / args.sweep
+    for p in (conf_path, sweep_path):
+        if not p.exists():
+            raise SystemExit(f"Missing file: {p}")
+    with stage("read_assumptions"):
+        assumptions = json.loads(conf_path.read_text())
+        sweep = json.loads(sweep_path.read_text())
+    with stage("sweep") as rec:
+        try:
+            df = run_sweep(assumptions, sweep, repo_root, chunk_size=args.chunk_size)
+        except ValueError as e:
+            raise SystemExit(str(e))
+        rec["rows"] = len(df)
+    with stage("write", rows=len(df)):
+        out = write_frame(df, repo_root / args.out)
+    print(f"Wrote {out} ({df['scenario'].nunique()} scenarios)")
+    if args.capital:
+        from capital import capital_from_sweep
+        from miner_catalog import MinerCatalog
+        with stage("capital") as rec:
+            cap = capital_from_sweep(df, assumptions, MinerCatalog.from_assumptions(assumptions, repo_root))
+            rec["rows"] = len(cap)
+        out = write_frame(cap, out.with_name(f"{out.stem}_capital{out.suffix}"))
+        print(f"Wrote {out}")
@@ -0,0 +1,213 @@
+# scripts/treasury.py
+# Lot-level treasury engine: coin inventory by mining month (FIFO lots) and sell policies
+# - Lots are implicit in two (scenarios x months) arrays: cumulative coins mined and cumulative
+#   coins sold. Under FIFO the remaining coins of every lot, the cost basis of a sale and the
+#   age of the coins sold all follow from these prefix sums (no per-lot objects)
+# - Sales are valued at the price path in the month of sale; cost basis is the accrual value
+#   (price in the month mined), so realized gain = sale value - FIFO basis
+# - Policies:
+#     "fixed_lag"        sell each month's coins lag_months later (default: sell_lag_months);
+#                        with flat prices this equals the old revenue_accrual.shift(lag)
+#     "hold_ltcg"        sell every lot once it is min_hold_months old (default 12), only in
+#                        months where price >= min_price_usd (default 0)
+#     "price_threshold"  sell `fraction` (default 1.0) of inventory in months where
+#                        price >= threshold_usd
+#     "dca"              sell `fraction` of inventory or usd_per_month worth every month
+# - End-of-horizon inventory (coins, basis, market value, by lot month) is reported, instead of
+#   dropping coins mined in the last months of the horizon
+#
+# Assumptions (optional; global block or per chain, chain wins):
+#   "treasury": {"policy": "price_threshold", "threshold_usd": 150000, "fraction": 0.5}
+
+import argparse
+import json
+import numpy as np
+from pathlib import Path
+
+POLICIES = ("fixed_lag", "hold_ltcg", "price_threshold", "dca")
+LTCG_MONTHS = 12
+
+# ---------- Policy config
+
+def treasury_policy(assumptions: dict, chain_conf: dict = None) -> dict:
+    """Effective policy for one chain: defaults <- assumptions["treasury"] <- chain["treasury"]."""
+    policy = {"policy": "fixed_lag", "lag_months": int(assumptions.get("sell_lag_months", 12))}
+    policy.update(assumptions.get("treasury", {}))
+    policy.update((chain_conf or {}).get("treasury", {}))
+    name = policy["policy"]
+    if name not in POLICIES:
+        raise ValueError(f"treasury.policy must be one of {POLICIES}")
+    if name == "price_threshold" and "threshold_usd" not in policy:
+        raise ValueError("treasury: price_threshold needs threshold_usd")
+    if name == "dca" and "fraction" not in policy and "usd_per_month" not in policy:
+        raise ValueError("treasury: dca needs fraction or usd_per_month")
+    if not 0.0 <= float(policy.get("fraction", 1.0)) <= 1.0:
+        raise ValueError("treasury: fraction must be in [0, 1]")
+    return policy
+
+# ---------- Sell schedule
+
+def _shift(values: np.ndarray, months: int) -> np.ndarray:
+    """Shift (scenarios, months) right by `months`, zero-filling."""
+    if months <= 0:
+        return values.copy()
+    out = np.zeros_like(values)
+    if months < values.shape[1]:
+        out[:, months:] = values[:, :-months]
+    return out
+
+def _sell_all_older_than(cum_mined: np.ndarray, ok: np.ndarray, age: int) -> np.ndarray:
+    """Cumulative sold when every lot at least `age` months old is sold in each `ok` month."""
+    months = cum_mined.shape[1]
+    last_ok = np.maximum.accumulate(np.where(ok, np.arange(months), -1), axis=1) - age
+    eligible = np.take_along_axis(cum_mined, np.maximum(last_ok, 0), axis=1)
+    return np.where(last_ok >= 0, eligible, 0.0)
+
+def sold_coins(coins: np.ndarray, price: np.ndarray, policy: dict) -> np.ndarray:
+    """(scenarios, months) coins sold per month under `policy` (FIFO across lots)."""
+    name = policy["policy"]
+    if name == "fixed_lag":
+        return _shift(coins, int(policy.get("lag_months", 12)))
+
+    cum_mined = np.cumsum(coins, axis=1)
+    if name == "hold_ltcg":
+        ok = price >= float(policy.get("min_price_usd", 0.0))
+        cum_sold = _sell_all_older_than(cum_mined, ok, int(policy.get("min_hold_months", LTCG_MONTHS)))
+        return np.diff(cum_sold, axis=1, prepend=0.0)
+
+    fraction = float(policy.get("fraction", 1.0))
+    if name == "price_threshold":
+        ok = price >= float(policy["threshold_usd"])
+        if fraction == 1.0:
+            return np.diff(_sell_all_older_than(cum_mined, ok, 0), axis=1, prepend=0.0)
+        rate = np.where(ok, fraction, 0.0)
+    else:
+        rate = None if "usd_per_month" in policy else np.full(coins.shape, fraction)
+
+    # Inventory recurrence, vectorized across scenarios: one step per month
+    sold = np.zeros_like(coins)
+    held = np.zeros(coins.shape[0])
+    usd = float(policy.get("usd_per_month", 0.0))
+    for t in range(coins.shape[1]):
+        held = held + coins[:, t]
+        if rate is not None:
+            sell = held * rate[:, t]
+        else:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                sell = np.minimum(held, np.where(price[:, t] > 0, usd / price[:, t], 0.0))
+        sold[:, t] = sell
+        held = held - sell
+    return sold
+
+# ---------- Valuation
+
+def _fifo_basis(cum_mined: np.ndarray, cum_basis: np.ndarray, cum_sold: np.ndarray) -> np.ndarray:
+    """Cumulative FIFO cost basis at every cumulative-sold level (one interp over all rows)."""
+    n, months = cum_mined.shape
+    xp = np.hstack([np.zeros((n, 1)), cum_mined])
+    fp = np.hstack([np.zeros((n, 1)), cum_basis])
+    # Offset each row so the concatenated x grid stays non-decreasing
+    offset = np.concatenate([[0.0], np.cumsum(xp[:, -1] + 1.0)[:-1]])[:, None]
+    return np.interp((cum_sold + offset).ravel(), (xp + offset).ravel(), fp.ravel()).reshape(n, months)
+
+def run_treasury(coins: np.ndarray, price: np.ndarray, policy: dict) -> dict:
+    """
+    Sales, inventory and FIFO basis for coins mined per month at `price` (both (months,) or
+    (scenarios, months)). Returns arrays of the same shape plus end-of-horizon lot inventory.
+    """
+    squeeze = np.ndim(coins) == 1
+    coins = np.atleast_2d(np.asarray(coins, dtype=float))
+    price = np.broadcast_to(np.atleast_2d(np.asarray(price, dtype=float)), coins.shape)
+
+    sold = sold_coins(coins, price, policy)
+    cum_mined = np.cumsum(coins, axis=1)
+    cum_sold = np.minimum(np.cumsum(sold, axis=1), cum_mined)
+    cum_basis_sold = _fifo_basis(cum_mined, np.cumsum(coins * price, axis=1), cum_sold)
+    prev_sold = _shift(cum_sold, 1)
+    # Coins sold this month that came from lots at least LTCG_MONTHS old (FIFO sells those first)
+    long_term = np.clip(np.minimum(cum_sold, _shift(cum_mined, LTCG_MONTHS)) - prev_sold, 0.0, None)
+
+    cash = sold * price
+    basis = np.diff(cum_basis_sold, axis=1, prepend=0.0)
+    inventory = cum_mined - cum_sold
+    lots_left = np.clip(cum_mined - np.maximum(cum_sold[:, -1:], _shift(cum_mined, 1)), 0.0, coins)
+    out = {
+        "sold_coins": sold,
+        "long_term_coins": long_term,
+        "cash_sales": cash,
+        "basis_sold": basis,
+        "realized_gain": cash - basis,
+        "inventory_coins": inventory,
+        "inventory_value": inventory * price,
+        "unsold_lot_coins": lots_left,
+        "unsold_lot_basis": lots_left * price,
+    }
+    if squeeze:
+        out = {k: v[0] for k, v in out.items()}
+    return out
+
+def cash_sales(coins: np.ndarray, price: np.ndarray, policy: dict) -> np.ndarray:
+    """Sale value per month only (the engines' cash_sales column)."""
+    squeeze = np.ndim(coins) == 1
+    coins = np.atleast_2d(np.asarray(coins, dtype=float))
+    price = np.broadcast_to(np.atleast_2d(np.asarray(price, dtype=float)), coins.shape)
+    cash = sold_coins(coins, price, policy) * price
+    return cash[0] if squeeze else cash
+
+# ---------- CLI
+
+if __name__ == "__main__":
+    import pandas as pd
+    from build_monthly_model import build_monthly_model
+
+    ap = argparse.ArgumentParser(description="Coin inventory, sales and unsold lots under a sell policy")
+    ap.add_argument("--policy", choices=POLICIES, default=None, help="overrides assumptions['treasury']")
+    ap.add_argument("--lag-months", type=int, default=None)
+    ap.add_argument("--min-hold-months", type=int, default=None)
+    ap.add_argument("--min-price-usd", type=float, default=None)
+    ap.add_argument("--threshold-usd", type=float, default=None)
+    ap.add_argument("--fraction", type=float, default=None)
+    ap.add_argument("--usd-per-month", type=float, default=None)
+    args = ap.parse_args()
+
+    repo_root = Path(".")
+    conf_path = repo_root / "config" / "assumptions.json"
+    if not conf_path.exists():
+        raise SystemExit(f"Missing assumptions file: {conf_path}")
+    assumptions = json.loads(conf_path.read_text())
+    overrides = {k: v for k, v in vars(args).items() if v is not None}
+    if overrides:
+        assumptions = dict(assumptions, treasury={**assumptions.get("treasury", {}), **overrides})
+        for chain in ("btc", "etc"):
+            assumptions[chain] = {k: v for k, v in assumptions[chain].items() if k != "treasury"}
+
+    monthly = build_monthly_model(assumptions, repo_root, round_output=False)
+    frames, lots = [], []
+    for chain in ("btc", "etc"):
+        policy = treasury_policy(assumptions, assumptions[chain])
+        coins = monthly[f"{chain}_coins_mined"].to_numpy()
+        price = monthly[f"{chain}_price_used"].to_numpy()
+        t = run_treasury(coins, price, policy)
+        frames.append(pd.DataFrame({
+            "period": monthly["period"], "chain": chain, "policy": policy["policy"],
+            "mined_coins": coins, "price": price,
+            **{k: v for k, v in t.items() if not k.startswith("unsold_lot")},
+        }))
+        left = t["unsold_lot_coins"] > 0
+        lots.append(pd.DataFrame({
+            "chain": chain, "lot_period": monthly["period"][left],
+            "coins": t["unsold_lot_coins"][left], "basis_usd": t["unsold_lot_basis"][left],
+            "value_usd": t["unsold_lot_coins"][left] * price[-1],
+        }))
+        print(f"{chain}: {policy['policy']} sold {t['sold_coins'].sum():.6f} of {coins.sum():.6f} coins; "
+              f"unsold {t['inventory_coins'][-1]:.6f} (${t['inventory_value'][-1]:,.2f} at last price)")
+
+    money = ["price", "cash_sales", "basis_sold", "realized_gain", "inventory_value"]
+    out_df = pd.concat(frames, ignore_index=True)
+    out_df[money] = out_df[money].round(2) + 0.0  # no "-0.0" in the CSV
+    lots_df = pd.concat(lots, ignore_index=True).round({"basis_usd": 2, "value_usd": 2})
+    (repo_root / "data").mkdir(parents=True, exist_ok=True)
+    for df, name in ((out_df, "treasury_monthly.csv"), (lots_df, "treasury_unsold_lots.csv")):
+        out = repo_root / "data" / name
+        df.round(6).to_csv(out, index=False)
+        print(f"Wrote {out}")
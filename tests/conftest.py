@@ -0,0 +1,7 @@
+# tests/conftest.py
+# The scripts are run from the repo root and import each other as siblings: put scripts/ on sys.path
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
@@ -0,0 +1,26 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from mining_core import monthly_columns
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _assumptions() -> dict:
+    return json.loads((ROOT / "config" / "assumptions.json").read_text())
+
+
+def test_monthly_columns_builds_plain_config():
+    cols = monthly_columns(_assumptions(), ROOT)
+    assert len(cols["month"]) > 0
+
+
+@pytest.mark.parametrize("layout", [
+    {"fleets": [{"chain": "btc", "model_name": "S21 Pro", "units": 4}]},
+    {"chains": ["btc"]},
+])
+def test_monthly_columns_rejects_fleet_layout(layout):
+    with pytest.raises(ValueError, match="build_all.py"):
+        monthly_columns(dict(_assumptions(), **layout), ROOT)
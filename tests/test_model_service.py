@@ -0,0 +1,37 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from model_service import ModelClient, ModelService, serve
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture(scope="module")
+def client():
+    server = serve(ModelService(ROOT, ROOT / "config" / "assumptions.json"), port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield ModelClient(f"http://127.0.0.1:{server.server_address[1]}")
+    server.shutdown()
+    server.server_close()
+
+
+def test_query_returns_annual_pnls(client):
+    result = client.query({}, include=["accrual"])
+    assert len(result["accrual"]) > 0
+
+
+def test_null_override_is_a_400_not_a_dropped_connection(client):
+    body = json.dumps({"overrides": {"btc.units": None}}).encode()
+    req = urllib.request.Request(client.url + "/model", data=body, headers={"Content-Type": "application/json"})
+    with pytest.raises(urllib.error.HTTPError) as exc:
+        urllib.request.urlopen(req, timeout=client.timeout)
+    assert exc.value.code == 400
+    assert "error" in json.loads(exc.value.read())
+    # The service is still up and answering
+    assert client.health() == {"status": "ok"}